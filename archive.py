@@ -0,0 +1,18 @@
+# archive.py
+import argparse
+import asyncio
+from services.archive import archive_once
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Перенос старых закрытых запросов в архивные таблицы")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="закрыты больше N дней назад")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    moved = await archive_once(args.days, args.batch_size)
+    print(f"✅ Archived {moved} requests")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+# bench/assign_stress.py
+"""
+Стресс-тест атомарного назначения: сотни модераторов одновременно жмут
+«взять» на один и тот же запрос — назначение должно пройти ровно одно.
+
+    python -m bench.assign_stress --moderators 300 --rounds 20
+
+Работает с настоящей БД из DB_URL (используйте тестовую базу): создаёт
+пользователей с id от --base-id и закрывает созданные запросы в конце.
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from bench.common import setup_env
+
+setup_env()
+
+from database import crud  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--moderators", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--base-id", type=int, default=9_000_000_000)
+    args = parser.parse_args()
+
+    user_id = args.base_id
+    moderator_ids = [args.base_id + 1 + i for i in range(args.moderators)]
+    for uid in [user_id, *moderator_ids]:
+        await crud.upsert_user(SimpleNamespace(id=uid, username=f"stress{uid}", first_name="Stress", last_name=None))
+
+    failures = 0
+    for round_no in range(1, args.rounds + 1):
+        req = await crud.create_support_request(user_id, "en")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            crud.assign_request_to_moderator(req.id, mod_id) for mod_id in moderator_ids
+        ))
+        elapsed = time.perf_counter() - start
+
+        winners = [r for r in results if r is not None]
+        stored = await crud.get_request_by_id(req.id)
+        ok = (
+            len(winners) == 1
+            and stored.status == "in_progress"
+            and stored.assigned_moderator_id == winners[0].assigned_moderator_id
+        )
+        failures += not ok
+        print(
+            f"round {round_no:3}: winners={len(winners)} "
+            f"assigned={stored.assigned_moderator_id} {elapsed * 1000:7.1f}ms {'OK' if ok else 'FAIL'}"
+        )
+        await crud.close_request(req.id)
+
+    print(f"{args.rounds - failures}/{args.rounds} rounds with exactly one winner")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# bench/cache_memory.py
+"""
+Память на закешированных пользователей: ORM-экземпляры User против UserSnapshot.
+
+    python -m bench.cache_memory --users 100000
+"""
+import argparse
+import gc
+import pickle
+import time
+import tracemalloc
+
+from bench.common import setup_env
+
+setup_env()
+
+from database.models import User  # noqa: E402
+from database.snapshots import UserSnapshot  # noqa: E402
+
+
+def make_orm(i: int) -> User:
+    return User(id=i, username=f"user{i}", full_name=f"User {i}", language_code="en", role="user")
+
+
+def make_snapshot(i: int) -> UserSnapshot:
+    return UserSnapshot(id=i, username=f"user{i}", full_name=f"User {i}", language_code="en", role="user")
+
+
+def measure(name: str, factory, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cache = {f"user:{i}": factory(i) for i in range(count)}
+    build = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Стоимость передачи через общий кеш (pickle туда и обратно)
+    sample = list(cache.values())[:10_000]
+    start = time.perf_counter()
+    for value in sample:
+        pickle.loads(pickle.dumps(value))
+    roundtrip = (time.perf_counter() - start) / len(sample)
+    size = sum(len(pickle.dumps(value)) for value in sample) / len(sample)
+
+    print(
+        f"{name:<10} {current / 1024 / 1024:8.1f} MiB  "
+        f"{current / count:7.0f} B/entry  build {build:6.2f}s  "
+        f"pickle {size:5.0f} B, {roundtrip * 1e6:6.1f} µs/roundtrip"
+    )
+    return current
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    orm = measure("orm", make_orm, args.users)
+    snap = measure("snapshot", make_snapshot, args.users)
+    print(f"snapshot / orm = {snap / orm:.2f}")
@@ -0,0 +1,149 @@
+# bench/hot_queries.py
+"""
+Планы и задержки горячих запросов на большой таблице.
+
+    python -m bench.hot_queries --requests 2000000 --messages 6000000 --budget-ms 5
+
+Работает с настоящей БД из DB_URL (используйте отдельную тестовую базу):
+применяет миграции, засевает support_requests / message_history (с
+--skip-seed — берёт то, что уже есть), затем для каждого запроса
+проверяет EXPLAIN (нужный индекс, без full scan и filesort) и p95.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+
+from bench.common import setup_env
+
+setup_env()
+
+from sqlalchemy import text  # noqa: E402
+from database.base import engine  # noqa: E402
+from database.migrations import run_migrations  # noqa: E402
+
+CHUNK = 10_000
+
+# Запросы из crud.py в том виде, как их строит SQLAlchemy
+HOT_QUERIES = {
+    "active_request_by_user": (
+        "ix_support_requests_user_status",
+        "SELECT id, user_id, assigned_moderator_id, status, language, created_at, taken_at, closed_at "
+        "FROM support_requests WHERE user_id = :user_id AND (status = 'in_progress' OR status = 'pending')",
+    ),
+    "active_request_by_moderator": (
+        "ix_support_requests_moderator_status",
+        "SELECT id, user_id, assigned_moderator_id, status, language, created_at, taken_at, closed_at "
+        "FROM support_requests WHERE assigned_moderator_id = :moderator_id AND status = 'in_progress'",
+    ),
+    "initial_message": (
+        "ix_message_history_request_id_id",
+        "SELECT id, request_id, sender_id, text, caption, photo_file_id "
+        "FROM message_history WHERE request_id = :request_id ORDER BY id LIMIT 1",
+    ),
+}
+
+
+async def seed(users: int, requests: int, messages: int):
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        await conn.execute(text("SET foreign_key_checks = 0"))
+        await conn.execute(
+            text("INSERT IGNORE INTO users (id, username, full_name, language_code, role) VALUES (:id, :u, :u, 'en', :role)"),
+            [{"id": i, "u": f"bench{i}", "role": "moderator" if i % 10 == 0 else "user"} for i in range(1, users + 1)]
+        )
+
+        for start in range(0, requests, CHUNK):
+            rows = []
+            for _ in range(min(CHUNK, requests - start)):
+                # Большинство запросов закрыты, как в реальной истории
+                status = random.choices(["closed", "in_progress", "pending"], weights=[95, 3, 2])[0]
+                rows.append({
+                    "user_id": random.randint(1, users),
+                    "mod": random.randrange(10, users + 1, 10) if status != "pending" else None,
+                    "status": status,
+                    "now": now,
+                })
+            await conn.execute(
+                text(
+                    "INSERT INTO support_requests (user_id, assigned_moderator_id, status, language, created_at) "
+                    "VALUES (:user_id, :mod, :status, 'en', :now)"
+                ),
+                rows
+            )
+            print(f"\rsupport_requests: {start + len(rows):,}", end="", flush=True)
+        print()
+
+        max_request = (await conn.execute(text("SELECT MAX(id) FROM support_requests"))).scalar()
+        for start in range(0, messages, CHUNK):
+            rows = [
+                {"request_id": random.randint(1, max_request), "sender_id": random.randint(1, users), "now": now}
+                for _ in range(min(CHUNK, messages - start))
+            ]
+            await conn.execute(
+                text(
+                    "INSERT INTO message_history (request_id, sender_id, text, timestamp) "
+                    "VALUES (:request_id, :sender_id, 'bench message', :now)"
+                ),
+                rows
+            )
+            print(f"\rmessage_history: {start + len(rows):,}", end="", flush=True)
+        print()
+        await conn.execute(text("SET foreign_key_checks = 1"))
+
+
+async def check(name: str, index: str, sql: str, params_factory, samples: int, budget_ms: float) -> bool:
+    async with engine.connect() as conn:
+        plan = (await conn.execute(text(f"EXPLAIN {sql}"), params_factory())).mappings().first()
+        extra = plan.get("Extra") or ""
+        plan_ok = plan["key"] == index and plan["type"] != "ALL" and "filesort" not in extra
+
+        latencies = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            (await conn.execute(text(sql), params_factory())).all()
+            latencies.append(time.perf_counter() - start)
+
+    p95 = statistics.quantiles(latencies, n=100)[94] * 1000
+    ok = plan_ok and p95 <= budget_ms
+    print(
+        f"{name:<28} key={plan['key']} type={plan['type']} rows={plan['rows']} extra='{extra}' "
+        f"p95={p95:.2f}ms {'OK' if ok else 'FAIL'}"
+    )
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=2_000_000)
+    parser.add_argument("--messages", type=int, default=6_000_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    await run_migrations()
+    if not args.skip_seed:
+        await seed(args.users, args.requests, args.messages)
+
+    async with engine.connect() as conn:
+        max_request = (await conn.execute(text("SELECT MAX(id) FROM support_requests"))).scalar()
+
+    params = {
+        "active_request_by_user": lambda: {"user_id": random.randint(1, args.users)},
+        "active_request_by_moderator": lambda: {"moderator_id": random.randrange(10, args.users + 1, 10)},
+        "initial_message": lambda: {"request_id": random.randint(1, max_request)},
+    }
+    results = [
+        await check(name, index, sql, params[name], args.samples, args.budget_ms)
+        for name, (index, sql) in HOT_QUERIES.items()
+    ]
+    await engine.dispose()
+    raise SystemExit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+# bench/relay_latency.py
+"""
+Задержка пересылки сообщений через common_messages.unified_handler
+для каждого бэкенда перевода.
+
+    python -m bench.relay_latency --messages 2000 --concurrency 50 --bot-latency-ms 0
+
+Telegram и БД подменяются заглушками в памяти, поэтому замер показывает
+накладные расходы самого конвейера и бэкенда перевода. http-бэкенд
+поднимает bench.translator_stub в том же процессе; openai — только при
+заданном OPENAI_API_KEY.
+"""
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from bench.common import setup_env, report
+
+setup_env()
+
+from handlers import common_messages  # noqa: E402
+from database import crud  # noqa: E402
+from services import openai, history_writer  # noqa: E402
+from services.translators import DictionaryTranslator, HTTPTranslator, create_translator  # noqa: E402
+from bench.translator_stub import start_stub  # noqa: E402
+
+USER = SimpleNamespace(id=1, role="user", language_code="en", username="user")
+MODERATOR = SimpleNamespace(id=2, role="moderator", language_code="ru", username="mod")
+REQUEST = SimpleNamespace(id=1, user_id=USER.id, assigned_moderator_id=MODERATOR.id, language="en")
+USERS = {USER.id: USER, MODERATOR.id: MODERATOR}
+LANGUAGES = [{"code": "en", "name_ru": "Английский"}, {"code": "ru", "name_ru": "Русский"}]
+
+
+class FakeBot:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def _call(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(message_id=1)
+
+    async def send_chat_action(self, *args, **kwargs):
+        return await self._call()
+
+    async def send_message(self, *args, **kwargs):
+        return await self._call()
+
+    async def send_photo(self, *args, **kwargs):
+        return await self._call()
+
+
+def install_fakes(db_latency: float):
+    async def db_roundtrip(*args, **kwargs):
+        if db_latency:
+            await asyncio.sleep(db_latency)
+
+    async def get_user(user_id):
+        return USERS.get(user_id)
+
+    async def get_active_request(user_id):
+        return REQUEST
+
+    async def get_languages():
+        return LANGUAGES
+
+    async def no_translation(*args, **kwargs):
+        return None
+
+    common_messages.get_user_cached = get_user
+    common_messages.get_active_request_by_user_cached = get_active_request
+    common_messages.get_language_name_cached = get_languages
+    history_writer.save_message = db_roundtrip
+    crud.get_cached_translation = no_translation
+    crud.save_cached_translation = db_roundtrip
+
+
+async def run_backend(name, translator, bot, messages: int, concurrency: int):
+    openai.set_translator(translator)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        # Уникальный текст, чтобы не попадать в кеш переводов
+        message = SimpleNamespace(
+            text=f"Hello, I need help with order #{i}",
+            caption=None,
+            photo=None,
+            media_group_id=None,
+            from_user=SimpleNamespace(id=USER.id),
+            bot=bot,
+        )
+        async with semaphore:
+            start = time.perf_counter()
+            await common_messages.unified_handler(message)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    report(name, latencies, time.perf_counter() - start)
+    await translator.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--bot-latency-ms", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0)
+    parser.add_argument("--stub-port", type=int, default=18088)
+    args = parser.parse_args()
+
+    install_fakes(args.db_latency_ms / 1000)
+    bot = FakeBot(args.bot_latency_ms / 1000)
+
+    await run_backend("dictionary", DictionaryTranslator(), bot, args.messages, args.concurrency)
+
+    runner = await start_stub("127.0.0.1", args.stub_port, args.stub_latency_ms)
+    try:
+        translator = HTTPTranslator(f"http://127.0.0.1:{args.stub_port}")
+        await run_backend("http-stub", translator, bot, args.messages, args.concurrency)
+    finally:
+        await runner.cleanup()
+
+    if os.getenv("OPENAI_API_KEY"):
+        await run_backend("openai", create_translator("openai"), bot, args.messages, args.concurrency)
+    else:
+        print("openai         пропущен: нет OPENAI_API_KEY")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
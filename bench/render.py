@@ -0,0 +1,49 @@
+# bench/render.py
+"""
+Горячий путь подстановки перевода: цепочка str.replace против Template.render.
+
+    python -m bench.render --iterations 1000000
+"""
+import argparse
+import timeit
+from html import escape
+
+from bench.common import setup_env
+
+setup_env()
+
+from services.i18n import Template  # noqa: E402
+
+RAW = "🆕 Новый запрос\\n\\n<b>Текст:</b>\\n{text}\\n\\nНажмите кнопку ниже, чтобы взять запрос."
+STATIC = "✅ Ваш запрос отправлен.\\nМодератор скоро подключится."
+USER_TEXT = "Не могу оплатить заказ #12345 <картой>, помогите"
+
+
+def replace_chain():
+    return RAW.replace("\\n", "\n").replace("{text}", escape(USER_TEXT))
+
+
+def replace_static():
+    return STATIC.replace("\\n", "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    template = Template(RAW)
+    static = Template(STATIC)
+    assert template.render({"text": USER_TEXT}) == replace_chain()
+    assert static.render({}) == replace_static()
+
+    cases = [
+        ("replace {text}", replace_chain),
+        ("render {text}", lambda: template.render({"text": USER_TEXT})),
+        ("replace static", replace_static),
+        ("render static", lambda: static.render({})),
+    ]
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=n, repeat=3))
+        print(f"{name:<16} {seconds / n * 1e9:8.1f} ns/call")
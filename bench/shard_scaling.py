@@ -0,0 +1,121 @@
+# bench/shard_scaling.py
+"""
+Пропускная способность многопроцессного режима в зависимости от числа
+воркеров.
+
+    python -m bench.shard_scaling --count 20000 --workers 1 2 4 --handler-cpu-us 300
+
+ingress (этот процесс) раскладывает сырые апдейты через
+services.sharding.ShardRouter, воркеры разбирают их в модели aiogram и
+прогоняют через Dispatcher с обработчиком-заглушкой: --handler-cpu-us
+микросекунд работы процессора и --handler-ms сна (ввод-вывод). Bot API
+не вызывается. Обработчик проверяет, что сообщения каждого пользователя
+пришли по порядку, и печатает число нарушений.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing as mp
+import time
+
+from bench.common import setup_env
+
+setup_env()
+
+from aiogram import Bot, Dispatcher, Router  # noqa: E402
+from aiogram.types import Message  # noqa: E402
+from services.sharding import ShardRouter, consume_shard  # noqa: E402
+
+
+def build_updates(count: int, users: int) -> list[bytes]:
+    return [
+        json.dumps({
+            "update_id": i + 1,
+            "message": {
+                "message_id": i + 1,
+                "date": 0,
+                "chat": {"id": i % users + 1, "type": "private"},
+                "from": {"id": i % users + 1, "is_bot": False, "first_name": "bench", "language_code": "en"},
+                "text": str(i),
+            },
+        }).encode()
+        for i in range(count)
+    ]
+
+
+async def _consume(shard, results, handler_cpu: float, handler_delay: float):
+    last_seen: dict[int, int] = {}
+    violations = 0
+    router = Router()
+
+    @router.message()
+    async def handle(message: Message):
+        nonlocal violations
+        deadline = time.perf_counter() + handler_cpu
+        while time.perf_counter() < deadline:
+            pass
+        if handler_delay:
+            await asyncio.sleep(handler_delay)
+        seq = int(message.text)
+        if seq < last_seen.get(message.from_user.id, -1):
+            violations += 1
+        last_seen[message.from_user.id] = seq
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    bot = Bot("123456:bench")
+    results.put("ready")
+    handled = await consume_shard(dp, bot, shard)
+    results.put((handled, violations))
+
+
+def _bench_worker(index: int, shard, results, handler_cpu: float, handler_delay: float):
+    asyncio.run(_consume(shard, results, handler_cpu, handler_delay))
+
+
+async def run(workers: int, bodies: list[bytes], handler_cpu: float, handler_delay: float) -> tuple[float, int]:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    target = functools.partial(_bench_worker, results=results, handler_cpu=handler_cpu, handler_delay=handler_delay)
+    router = ShardRouter(workers, target, 1000)
+
+    loop = asyncio.get_running_loop()
+    for _ in range(workers):
+        await loop.run_in_executor(None, results.get)
+
+    started = time.perf_counter()
+    for body in bodies:
+        await router.submit(body)
+    stopping = asyncio.create_task(router.stop())
+    totals = [await loop.run_in_executor(None, results.get) for _ in range(workers)]
+    elapsed = time.perf_counter() - started
+    await stopping
+
+    handled = sum(item[0] for item in totals)
+    assert handled == len(bodies), (handled, len(bodies))
+    return elapsed, sum(item[1] for item in totals)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--handler-cpu-us", type=float, default=300)
+    parser.add_argument("--handler-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    bodies = build_updates(args.count, args.users)
+    baseline = None
+    for workers in args.workers:
+        elapsed, violations = await run(workers, bodies, args.handler_cpu_us / 1e6, args.handler_ms / 1000)
+        rate = len(bodies) / elapsed
+        baseline = baseline or rate
+        print(
+            f"workers={workers:<3} n={len(bodies):<7} {elapsed:7.2f}s  "
+            f"{rate:9.1f} updates/s  x{rate / baseline:4.2f}  order violations={violations}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
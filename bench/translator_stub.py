@@ -0,0 +1,44 @@
+# bench/translator_stub.py
+"""
+Локальный HTTP-сервер-заглушка для TRANSLATOR_BACKEND=http.
+
+    python -m bench.translator_stub --port 8088 --latency-ms 50
+
+Возвращает тексты без изменений (или с префиксом языка, --tag),
+с искусственной задержкой, чтобы имитировать сетевой переводчик.
+"""
+import argparse
+import asyncio
+from aiohttp import web
+
+
+def make_app(latency_ms: float = 0.0, tag: bool = False) -> web.Application:
+    async def translate(request: web.Request) -> web.Response:
+        payload = await request.json()
+        texts = payload.get("texts", [])
+        lang = payload.get("lang", "")
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        translations = [f"[{lang}] {text}" if tag else text for text in texts]
+        return web.json_response({"translations": translations})
+
+    app = web.Application()
+    app.router.add_post("/translate", translate)
+    return app
+
+
+async def start_stub(host: str, port: int, latency_ms: float = 0.0, tag: bool = False) -> web.AppRunner:
+    runner = web.AppRunner(make_app(latency_ms, tag))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--tag", action="store_true")
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency_ms, args.tag), host=args.host, port=args.port)
@@ -0,0 +1,169 @@
+# bench/webhook_replay.py
+"""
+Пропускная способность получения апдейтов: long polling против вебхука.
+
+    python -m bench.webhook_replay --updates recorded.jsonl --handler-ms 20 --rtt-ms 50
+    python -m bench.webhook_replay --count 5000 --users 200
+
+Апдейты берутся из JSONL (по одному Update на строку, как их отдаёт
+getUpdates) или генерируются. Обработчик — заглушка, которая спит
+--handler-ms (ввод-вывод в БД и Bot API), так что замер показывает
+именно транспорт:
+  polling — getUpdates из подменённой сессии по 100 штук с задержкой --rtt-ms;
+  webhook — services.webhook на локальном порту, --connections параллельных
+            POST-ов (как max_connections у Telegram).
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench.common import setup_env
+
+setup_env()
+
+from aiogram import Bot, Dispatcher, Router  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.methods import GetMe, GetUpdates  # noqa: E402
+from aiogram.types import Message, Update, User  # noqa: E402
+from aiohttp import ClientSession, web  # noqa: E402
+from services.webhook import UpdatePool, build_webhook_app, SECRET_HEADER  # noqa: E402
+
+SECRET = "bench-secret"
+PATH = "/telegram/webhook"
+
+
+def load_updates(path: str | None, count: int, users: int) -> list[dict]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return [
+        {
+            "update_id": i + 1,
+            "message": {
+                "message_id": i + 1,
+                "date": 0,
+                "chat": {"id": i % users + 1, "type": "private"},
+                "from": {"id": i % users + 1, "is_bot": False, "first_name": "bench"},
+                "text": f"message {i}",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+class ReplaySession(BaseSession):
+    """
+    Сессия Bot API в памяти: getUpdates отдаёт записанные апдейты пачками
+    с задержкой rtt, остальные методы отвечают True.
+    """
+
+    def __init__(self, updates: list[dict], rtt: float):
+        super().__init__()
+        self.updates = updates
+        self.rtt = rtt
+        self.position = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        await asyncio.sleep(self.rtt)
+        if isinstance(method, GetMe):
+            return User(id=1, is_bot=True, first_name="bench", username="bench_bot")
+        if isinstance(method, GetUpdates):
+            batch = self.updates[self.position:self.position + (method.limit or 100)]
+            self.position += len(batch)
+            return [Update.model_validate(item, context={"bot": bot}) for item in batch]
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        raise NotImplementedError
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def build_dispatcher(total: int, handler_delay: float) -> tuple[Dispatcher, asyncio.Event]:
+    done = asyncio.Event()
+    handled = 0
+    router = Router()
+
+    @router.message()
+    async def handle(message: Message):
+        nonlocal handled
+        if handler_delay:
+            await asyncio.sleep(handler_delay)
+        handled += 1
+        if handled == total:
+            done.set()
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp, done
+
+
+async def run_polling(updates: list[dict], handler_delay: float, rtt: float) -> float:
+    dp, done = build_dispatcher(len(updates), handler_delay)
+    bot = Bot("123456:bench", session=ReplaySession(updates, rtt))
+    started = time.perf_counter()
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False))
+    await done.wait()
+    elapsed = time.perf_counter() - started
+    await dp.stop_polling()
+    await polling
+    return elapsed
+
+
+async def run_webhook(updates: list[dict], handler_delay: float, connections: int, workers: int) -> float:
+    dp, done = build_dispatcher(len(updates), handler_delay)
+    bot = Bot("123456:bench", session=ReplaySession([], 0))
+    pool = UpdatePool(dp, bot, workers, 1000)
+    runner = web.AppRunner(build_webhook_app(pool, PATH, SECRET))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    pool.start()
+
+    bodies = [json.dumps(item).encode() for item in updates]
+    url = f"http://127.0.0.1:{port}{PATH}"
+    headers = {SECRET_HEADER: SECRET, "Content-Type": "application/json"}
+
+    async def deliver(http: ClientSession, offset: int):
+        # Как Telegram: по каждому соединению следующий апдейт после ответа
+        for body in bodies[offset::connections]:
+            async with http.post(url, data=body, headers=headers) as response:
+                assert response.status == 200, response.status
+
+    started = time.perf_counter()
+    async with ClientSession() as http:
+        await asyncio.gather(*(deliver(http, i) for i in range(connections)))
+        await done.wait()
+    elapsed = time.perf_counter() - started
+
+    await pool.stop(5)
+    await runner.cleanup()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", help="JSONL с записанными апдейтами")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--handler-ms", type=float, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=50, help="задержка getUpdates до Bot API")
+    parser.add_argument("--connections", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+
+    updates = load_updates(args.updates, args.count, args.users)
+    handler_delay = args.handler_ms / 1000
+
+    for name, elapsed in (
+        ("polling", await run_polling(updates, handler_delay, args.rtt_ms / 1000)),
+        ("webhook", await run_webhook(updates, handler_delay, args.connections, args.workers)),
+    ):
+        print(f"{name:<8} n={len(updates):<6} {elapsed:7.2f}s  {len(updates) / elapsed:9.1f} updates/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,24 @@
 # bot.py
 import asyncio
+import signal
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.bot import Bot, DefaultBotProperties
-from config import BOT_TOKEN
-from services.i18n import load_translations
+from config import BOT_TOKEN, BOT_MODE, ARCHIVE_AFTER_DAYS, SHARD_WORKERS
+from services.i18n import load_translations, watch_translations
+from database.migrations import run_migrations
+from keyboards.registry import build_language_keyboard
 from utils.logger import setup_logger, logger
 from middlewares.group_filter import GroupFilterMiddleware
-from tasks.poller import poll_status_table
+from tasks.poller import run_status_poller
+from services.leader import run_as_leader
+from services.shared_cache import shared_cache
+from services.routing import load_routing, watch_routing
+from services import history_writer
+from services.archive import run_archiver
+from services.webhook import run_webhook
+from services.broadcast import watch_failed_edits
+from services.sharding import run_ingress, consume_shard
 
 
 bot = Bot(
@@ -15,13 +26,7 @@ bot = Bot(
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
 
-async def main():
-    setup_logger()
-    logger.info("Launching bot...")
-
-    await load_translations()
-    logger.info("✅ Translations loaded")
-
+def build_dispatcher() -> Dispatcher:
     from handlers import start, user_request, moderator, common_messages, admin
 
     dp = Dispatcher()
@@ -38,11 +43,77 @@ async def main():
         common_messages.router,
         admin.admin_router,
     )
+    return dp
+
+async def prepare() -> Dispatcher:
+    await load_translations()
+    logger.info("✅ Translations loaded")
+    asyncio.create_task(watch_translations())
+    await build_language_keyboard()
+
+    # Подписка на инвалидации из других процессов
+    await shared_cache.start()
+
+    await load_routing()
+    asyncio.create_task(watch_routing())
+    # Неудавшиеся правки анонсов хранятся в процессе — повторяет каждый сам
+    asyncio.create_task(watch_failed_edits(bot))
+
+    dp = build_dispatcher()
+
+    # Фоновый таск: при нескольких процессах опрашивает (и слушает хук) только лидер
+    asyncio.create_task(run_as_leader("status_poller", lambda: run_status_poller(bot)))
+    if ARCHIVE_AFTER_DAYS > 0:
+        asyncio.create_task(run_as_leader("archiver", run_archiver))
+    return dp
+
+async def worker(index: int, shard):
+    setup_logger()
+    logger.info(f"Launching shard worker {index}...")
+    dp = await prepare()
+    await dp.emit_startup(bot=bot)
+    try:
+        handled = await consume_shard(dp, bot, shard)
+        logger.info(f"Shard worker {index} stopped after {handled} updates")
+    finally:
+        await history_writer.stop()
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+
+def run_worker(index: int, shard):
+    # Останавливает воркера ingress (через None в очереди), а не сигнал
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(worker(index, shard))
+
+async def main():
+    setup_logger()
+    logger.info("Launching bot...")
+
+    # Код читает колонки, которые добавляют миграции (translations.updated_at
+    # и др.), поэтому схема догоняется до старта, а не отдельным шагом
+    applied = await run_migrations()
+    if applied:
+        logger.info(f"✅ Applied migrations: {', '.join(applied)}")
+
+    if SHARD_WORKERS > 0:
+        # Ingress сам апдейты не обрабатывает: только раздаёт воркерам
+        allowed_updates = build_dispatcher().resolve_used_update_types()
+        await run_ingress(bot, allowed_updates, SHARD_WORKERS, run_worker)
+        return
 
-    logger.info("🚀 Bot is polling...")
-    # Фоновый таск
-    asyncio.create_task(poll_status_table(bot))
-    await dp.start_polling(bot)
+    dp = await prepare()
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            # getUpdates не работает, пока в Telegram висит вебхук от webhook-режима
+            await bot.delete_webhook()
+            logger.info("🚀 Bot is polling...")
+            await dp.start_polling(bot)
+    finally:
+        # Дописываем историю сообщений, оставшуюся в очереди
+        await history_writer.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -11,3 +11,115 @@ SUPPORT_GROUP_RU_ID = int(os.getenv("SUPPORT_GROUP_RU_ID"))
 SUPPORT_GROUP_EN_ID = int(os.getenv("SUPPORT_GROUP_EN_ID"))
 
 ADMIN_IDS = list(map(int, os.getenv("ADMIN_IDS", "").split(",")))
+
+# Рассылка новых запросов по группам поддержки
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "10"))
+BROADCAST_RETRIES = int(os.getenv("BROADCAST_RETRIES", "3"))
+
+# Редактирование анонсов в группах: лимит на один чат (токен-бакет)
+GROUP_EDIT_RATE = float(os.getenv("GROUP_EDIT_RATE", "1"))      # токенов в секунду
+GROUP_EDIT_BURST = int(os.getenv("GROUP_EDIT_BURST", "3"))      # ёмкость бакета
+GROUP_EDIT_RETRY_INTERVAL = float(os.getenv("GROUP_EDIT_RETRY_INTERVAL", "60"))  # повтор неудавшихся правок, секунд
+GROUP_EDIT_RETRY_ROUNDS = int(os.getenv("GROUP_EDIT_RETRY_ROUNDS", "5"))
+
+# Кеш переводов: бюджет памяти для in-process LRU (в байтах)
+TRANSLATION_CACHE_BYTES = int(os.getenv("TRANSLATION_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+# Микро-батчинг переводов
+TRANSLATION_BATCH_WINDOW_MS = float(os.getenv("TRANSLATION_BATCH_WINDOW_MS", "5"))
+TRANSLATION_BATCH_MAX_ITEMS = int(os.getenv("TRANSLATION_BATCH_MAX_ITEMS", "16"))
+TRANSLATION_BATCH_MAX_TOKENS = int(os.getenv("TRANSLATION_BATCH_MAX_TOKENS", "2000"))
+
+# Бэкенд перевода: openai / http (локальный сервер-заглушка) / dictionary
+TRANSLATOR_BACKEND = os.getenv("TRANSLATOR_BACKEND", "openai")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+TRANSLATOR_HTTP_URL = os.getenv("TRANSLATOR_HTTP_URL", "http://127.0.0.1:8088")
+TRANSLATOR_DICT_PATH = os.getenv("TRANSLATOR_DICT_PATH")
+
+# Как часто обновлять "печатает..." пока идёт перевод (Telegram гасит его через 5 с)
+CHAT_ACTION_INTERVAL = float(os.getenv("CHAT_ACTION_INTERVAL", "4"))
+
+# Стриминг перевода длинных сообщений (по умолчанию выключен)
+TRANSLATION_STREAMING = os.getenv("TRANSLATION_STREAMING", "0") == "1"
+TRANSLATION_STREAM_MIN_CHARS = int(os.getenv("TRANSLATION_STREAM_MIN_CHARS", "400"))
+TRANSLATION_STREAM_EDIT_INTERVAL = float(os.getenv("TRANSLATION_STREAM_EDIT_INTERVAL", "1.0"))
+
+# Адаптивный лимит параллельных запросов к переводчику (AIMD)
+TRANSLATION_CONCURRENCY_INITIAL = int(os.getenv("TRANSLATION_CONCURRENCY_INITIAL", "5"))
+TRANSLATION_CONCURRENCY_MIN = int(os.getenv("TRANSLATION_CONCURRENCY_MIN", "1"))
+TRANSLATION_CONCURRENCY_MAX = int(os.getenv("TRANSLATION_CONCURRENCY_MAX", "20"))
+TRANSLATION_TARGET_LATENCY = float(os.getenv("TRANSLATION_TARGET_LATENCY", "5.0"))  # секунд
+
+# Предохранитель: после N неудач подряд переводчик считается деградировавшим
+TRANSLATION_BREAKER_FAILURES = int(os.getenv("TRANSLATION_BREAKER_FAILURES", "5"))
+TRANSLATION_BREAKER_RESET = float(os.getenv("TRANSLATION_BREAKER_RESET", "30"))     # секунд
+TRANSLATION_UNAVAILABLE_MARKER = os.getenv("TRANSLATION_UNAVAILABLE_MARKER", "⚠️ перевод временно недоступен")
+
+# Опрос таблицы status
+STATUS_BATCH_SIZE = int(os.getenv("STATUS_BATCH_SIZE", "100"))
+STATUS_POLL_MIN_INTERVAL = float(os.getenv("STATUS_POLL_MIN_INTERVAL", "0.5"))
+STATUS_POLL_MAX_INTERVAL = float(os.getenv("STATUS_POLL_MAX_INTERVAL", "5"))
+# Хук пробуждения для админки: HTTP на 127.0.0.1:PORT или UNIX-сокет (по умолчанию выключен)
+STATUS_WAKE_PORT = int(os.getenv("STATUS_WAKE_PORT", "0"))
+STATUS_WAKE_SOCKET = os.getenv("STATUS_WAKE_SOCKET")
+
+# Лидерство фоновых задач между несколькими процессами бота (MySQL GET_LOCK)
+LEADER_RETRY_INTERVAL = float(os.getenv("LEADER_RETRY_INTERVAL", "3"))
+LEADER_HEARTBEAT_INTERVAL = float(os.getenv("LEADER_HEARTBEAT_INTERVAL", "3"))
+
+# Общий кеш между процессами бота: memory (только этот процесс) / redis
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+CACHE_CHANNEL = os.getenv("CACHE_CHANNEL", "support-bot:cache")
+# L1 near-cache перед сетевым бэкендом (0 — выключен)
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", "300"))
+CACHE_L1_MAX_ITEMS = int(os.getenv("CACHE_L1_MAX_ITEMS", "10000"))
+# Доля TTL, после которой запись обновляется в фоне (stale-while-revalidate)
+CACHE_REFRESH_AHEAD = float(os.getenv("CACHE_REFRESH_AHEAD", "0.8"))
+# Сколько помнить «строки нет» (нет активного запроса и т.п.), секунд
+CACHE_NEGATIVE_TTL = float(os.getenv("CACHE_NEGATIVE_TTL", "30"))
+
+# Как часто дозагружать изменённые переводы (по updated_at), 0 — не следить
+TRANSLATIONS_POLL_INTERVAL = float(os.getenv("TRANSLATIONS_POLL_INTERVAL", "60"))
+# Полная перезагрузка (замечает удалённые строки), секунд
+TRANSLATIONS_FULL_RELOAD_INTERVAL = float(os.getenv("TRANSLATIONS_FULL_RELOAD_INTERVAL", "900"))
+
+# Как часто проверять группы поддержки, изменённые в админке (секунд, 0 — не проверять)
+ROUTING_POLL_INTERVAL = float(os.getenv("ROUTING_POLL_INTERVAL", "30"))
+
+# Как часто пересобирать клавиатуру выбора языка из таблицы languages (секунд)
+LANGUAGE_KEYBOARD_TTL = float(os.getenv("LANGUAGE_KEYBOARD_TTL", "300"))
+
+# Отложенная пакетная запись истории сообщений
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "200"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.05"))  # секунд
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+HISTORY_DRAIN_TIMEOUT = float(os.getenv("HISTORY_DRAIN_TIMEOUT", "5"))  # сколько ждать записи строк запроса
+
+# Постраничное чтение переписок
+TRANSCRIPT_PAGE_SIZE = int(os.getenv("TRANSCRIPT_PAGE_SIZE", "500"))
+
+# Архивация закрытых запросов в *_archive таблицы (0 дней — не архивировать)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))   # запросов в одной транзакции
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "3600"))    # секунд между проходами
+
+# Получение апдейтов: polling (getUpdates) / webhook (aiohttp за reverse proxy)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Публичный адрес вебхука, например https://bot.example.com; пусто — setWebhook не вызывается
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+# Сверяется с заголовком X-Telegram-Bot-Api-Secret-Token (A-Z, a-z, 0-9, _ и -)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))    # параллельных доставок от Telegram
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "64"))            # одновременно обрабатываемых апдейтов
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+WEBHOOK_SHUTDOWN_TIMEOUT = float(os.getenv("WEBHOOK_SHUTDOWN_TIMEOUT", "30"))  # секунд на дообработку очереди
+
+# Шардирование обработки по процессам: ingress + N воркеров (0 — один процесс)
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))
+SHARD_QUEUE_SIZE = int(os.getenv("SHARD_QUEUE_SIZE", "1000"))          # апдейтов в очереди воркера
+SHARD_CONCURRENCY = int(os.getenv("SHARD_CONCURRENCY", "64"))          # апдейтов в работе у воркера
+SHARD_SHUTDOWN_TIMEOUT = float(os.getenv("SHARD_SHUTDOWN_TIMEOUT", "30"))  # секунд на дообработку
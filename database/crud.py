@@ -1,13 +1,35 @@
 # database/crud.py
-from sqlalchemy import select, update, delete, or_
+from sqlalchemy import select, update, delete, or_, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.dialects.mysql import insert
 from database.base import async_session
-from database.models import User, SupportRequest, MessageHistory, Language, Status, SupportGroup, SupportRequestMessage
+from database import events
+from database.snapshots import (
+    UserSnapshot,
+    RequestSnapshot,
+    MessageSnapshot,
+    SupportGroupSnapshot,
+    columns
+)
+from database.models import (
+    User,
+    SupportRequest,
+    MessageHistory,
+    Language,
+    Status,
+    SupportGroup,
+    SupportGroupLanguage,
+    SupportRequestMessage,
+    TranslationCacheEntry,
+    ArchivedRequest,
+    ArchivedMessage,
+    ArchivedRequestMessage
+)
 from datetime import datetime
 from aiogram.types import Message
 from utils.logger import logger
-from typing import Optional
+from config import TRANSCRIPT_PAGE_SIZE
+from typing import Optional, Awaitable, Callable, AsyncIterator
 import traceback
 
 async def upsert_user(tg_user):
@@ -28,19 +50,25 @@ async def upsert_user(tg_user):
             result = await session.execute(select(User).where(User.id == tg_user.id))
             user = result.scalar_one()
             logger.info(f"User {tg_user.id} upserted successfully.")
+            await events.publish("user_changed", user_id=tg_user.id)
             return user  # <- обязательно вернуть user
     except Exception as e:
         logger.error(f"Error in upsert_user: {e}\n{traceback.format_exc()}")
         return None
 
-async def get_user(user_id: int) -> Optional[User]:
+# Читающие функции, которые стоят за кешем (services/cache.py), после
+# записи в лог пробрасывают ошибку БД: иначе кеш запомнил бы её как «строки нет»
+async def get_user(user_id: int) -> Optional[UserSnapshot]:
     try:
         async with async_session() as session:
-            result = await session.execute(select(User).where(User.id == user_id))
-            return result.scalar_one_or_none()
+            result = await session.execute(
+                select(*columns(User, UserSnapshot)).where(User.id == user_id)
+            )
+            row = result.one_or_none()
+            return UserSnapshot(*row) if row else None
     except Exception as e:
         logger.error(f"Error in get_user({user_id}): {e}\n{traceback.format_exc()}")
-        return None
+        raise
 
 async def set_user_language(user_id: int, lang: str):
     try:
@@ -50,6 +78,7 @@ async def set_user_language(user_id: int, lang: str):
             )
             await session.commit()
             logger.info(f"User {user_id} language set to {lang}")
+            await events.publish("user_changed", user_id=user_id)
     except Exception as e:
         logger.error(f"Error in set_user_language({user_id}, {lang}): {e}\n{traceback.format_exc()}")
 
@@ -61,6 +90,7 @@ async def create_support_request(user_id: int, lang: str) -> Optional[SupportReq
             await session.commit()
             await session.refresh(req)
             logger.info(f"SupportRequest {req.id} created for user {user_id}")
+            await events.publish("request_changed", request_id=req.id, user_id=user_id, moderator_id=None)
             return req
     except Exception as e:
         logger.error(f"Error in create_support_request({user_id}, {lang}): {e}\n{traceback.format_exc()}")
@@ -88,42 +118,66 @@ async def save_message(
     except Exception as e:
         logger.error(f"Error in save_message(request_id={request_id}, sender_id={sender_id}): {e}\n{traceback.format_exc()}")
 
-async def assign_request_to_moderator(request_id: int, moderator_id: int) -> bool:
+async def save_messages(rows: list[dict]):
+    """
+    Сохраняет пачку MessageHistory одним многострочным INSERT.
+    """
+    if not rows:
+        return
+    async with async_session() as session:
+        await session.execute(insert(MessageHistory), rows)
+        await session.commit()
+
+async def assign_request_to_moderator(request_id: int, moderator_id: int) -> Optional[RequestSnapshot]:
+    """
+    Атомарно назначает модератора: один условный UPDATE ... WHERE status='pending'.
+    Из двух одновременных «взять» проходит ровно один.
+    Возвращает обновлённый запрос или None, если его уже взяли.
+    """
     try:
         async with async_session() as session:
             result = await session.execute(
-                select(SupportRequest).where(SupportRequest.id == request_id)
+                update(SupportRequest)
+                .where(SupportRequest.id == request_id, SupportRequest.status == "pending")
+                .values(status="in_progress", assigned_moderator_id=moderator_id, taken_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
             )
-            req = result.scalar_one_or_none()
-            if not req or req.status != "pending":
-                return False
+            if result.rowcount != 1:
+                await session.rollback()
+                return None
 
-            req.status = "in_progress"
-            req.assigned_moderator_id = moderator_id
-            req.taken_at = datetime.utcnow()
+            result = await session.execute(
+                select(*columns(SupportRequest, RequestSnapshot)).where(SupportRequest.id == request_id)
+            )
+            req = RequestSnapshot(*result.one())
             await session.commit()
             logger.info(f"Request {request_id} assigned to moderator {moderator_id}")
-            return True
+            await events.publish("request_changed", request_id=request_id, user_id=req.user_id, moderator_id=moderator_id)
+            return req
     except Exception as e:
         logger.error(f"Error in assign_request_to_moderator({request_id}, {moderator_id}): {e}\n{traceback.format_exc()}")
-        return False
+        return None
 
-async def get_request_by_id(request_id: int) -> Optional[SupportRequest]:
+async def get_request_by_id(request_id: int) -> Optional[RequestSnapshot]:
     try:
         async with async_session() as session:
-            result = await session.execute(
-                select(SupportRequest).where(SupportRequest.id == request_id)
-            )
-            return result.scalar_one_or_none()
+            for model in (SupportRequest, ArchivedRequest):
+                result = await session.execute(
+                    select(*columns(model, RequestSnapshot)).where(model.id == request_id)
+                )
+                row = result.one_or_none()
+                if row:
+                    return RequestSnapshot(*row)
+            return None
     except Exception as e:
         logger.error(f"Error in get_request_by_id({request_id}): {e}\n{traceback.format_exc()}")
-        return None
+        raise
 
-async def get_active_request_by_user(user_id: int) -> Optional[SupportRequest]:
+async def get_active_request_by_user(user_id: int) -> Optional[RequestSnapshot]:
     try:
         async with async_session() as session:
             result = await session.execute(
-                select(SupportRequest)
+                select(*columns(SupportRequest, RequestSnapshot))
                 .where(
                     SupportRequest.user_id == user_id,
                     or_(
@@ -132,28 +186,35 @@ async def get_active_request_by_user(user_id: int) -> Optional[SupportRequest]:
                     )
                 )
             )
-            return result.scalar_one_or_none()
+            row = result.one_or_none()
+            return RequestSnapshot(*row) if row else None
     except Exception as e:
         logger.error(
             f"Error in get_active_request_by_user({user_id}): {e}\n{traceback.format_exc()}"
         )
-        return None
+        raise
 
-async def get_active_request_by_moderator(moderator_id: int) -> Optional[SupportRequest]:
+async def get_active_request_by_moderator(moderator_id: int) -> Optional[RequestSnapshot]:
     try:
         async with async_session() as session:
             result = await session.execute(
-                select(SupportRequest)
+                select(*columns(SupportRequest, RequestSnapshot))
                 .where(SupportRequest.assigned_moderator_id == moderator_id, SupportRequest.status == "in_progress")
             )
-            return result.scalar_one_or_none()
+            row = result.one_or_none()
+            return RequestSnapshot(*row) if row else None
     except Exception as e:
         logger.error(f"Error in get_active_request_by_moderator({moderator_id}): {e}\n{traceback.format_exc()}")
-        return None
+        raise
 
 async def close_request(request_id: int):
     try:
         async with async_session() as session:
+            result = await session.execute(
+                select(SupportRequest.user_id, SupportRequest.assigned_moderator_id)
+                .where(SupportRequest.id == request_id)
+            )
+            row = result.one_or_none()
             await session.execute(
                 update(SupportRequest)
                 .where(SupportRequest.id == request_id)
@@ -161,25 +222,32 @@ async def close_request(request_id: int):
             )
             await session.commit()
             logger.info(f"Request {request_id} closed.")
+            if row:
+                await events.publish("request_changed", request_id=request_id, user_id=row.user_id, moderator_id=row.assigned_moderator_id)
     except Exception as e:
         logger.error(f"Error in close_request({request_id}): {e}\n{traceback.format_exc()}")
 
-async def get_initial_message(request_id: int) -> Optional[MessageHistory]:
+async def get_initial_message(request_id: int) -> Optional[MessageSnapshot]:
     """
     Возвращает первое сообщение (инициирующее запрос) для данного request_id.
+    Если запрос уже в архиве — ищет в message_history_archive.
     """
     try:
         async with async_session() as session:
-            result = await session.execute(
-                select(MessageHistory)
-                .where(MessageHistory.request_id == request_id)
-                .order_by(MessageHistory.id)
-                .limit(1)
-            )
-            return result.scalar_one_or_none()
+            for model in (MessageHistory, ArchivedMessage):
+                result = await session.execute(
+                    select(*columns(model, MessageSnapshot))
+                    .where(model.request_id == request_id)
+                    .order_by(model.id)
+                    .limit(1)
+                )
+                row = result.one_or_none()
+                if row:
+                    return MessageSnapshot(*row)
+            return None
     except Exception as e:
         logger.error(f"Error in get_initial_message({request_id}): {e}")
-        return None
+        raise
     
 async def get_available_languages():
     async with async_session() as session:
@@ -198,17 +266,52 @@ async def get_pending_statuses():
         result = await session.execute(select(Status))
         return result.scalars().all()
 
+async def process_pending_statuses(
+    limit: int,
+    handler: Callable[[list[Status]], Awaitable[None]]
+) -> int:
+    """
+    Забирает до limit записей status (FOR UPDATE SKIP LOCKED) и удаляет их
+    одним DELETE в короткой транзакции, а handler вызывает уже после коммита:
+    медленная отправка в Telegram не держит блокировки и соединение.
+    Возвращает количество обработанных записей.
+    """
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(
+                select(Status)
+                .order_by(Status.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            entries = result.scalars().all()
+            if not entries:
+                return 0
+
+            await session.execute(
+                delete(Status).where(Status.id.in_([entry.id for entry in entries]))
+            )
+
+    # Запись в status означает, что админка сменила пользователю роль:
+    # кеш сбрасываем до уведомления, чтобы следующий клик видел новую роль
+    for entry in entries:
+        await events.publish("user_changed", user_id=entry.id)
+
+    await handler(entries)
+    return len(entries)
+
 async def delete_status_by_id(user_id: int):
     async with async_session() as session:
         await session.execute(delete(Status).where(Status.id == user_id))
         await session.commit()
 
-async def get_support_group(group_id: int):
+async def get_support_group(group_id: int) -> Optional[SupportGroupSnapshot]:
     async with async_session() as session:
         result = await session.execute(
-            select(SupportGroup).where(SupportGroup.id == group_id)
+            select(*columns(SupportGroup, SupportGroupSnapshot)).where(SupportGroup.id == group_id)
         )
-        return result.scalar_one_or_none()
+        row = result.one_or_none()
+        return SupportGroupSnapshot(*row) if row else None
 
 async def create_or_update_support_group(group_id: int, title: str, photo_url: str | None):
     async with async_session() as session:
@@ -221,7 +324,31 @@ async def create_or_update_support_group(group_id: int, title: str, photo_url: s
             session.add(SupportGroup(id=group_id, title=title, photo_url=photo_url))
 
         await session.commit()
+    await events.publish("groups_changed", group_id=group_id)
     
+async def get_routing_fingerprint() -> tuple:
+    """
+    Дешёвый отпечаток групп и их языков: меняется при любом добавлении,
+    удалении или переименовании (в таблицах нет updated_at).
+    """
+    async with async_session() as session:
+        groups = await session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(func.crc32(func.concat(SupportGroup.id, ":", SupportGroup.title))), 0)
+            )
+        )
+        languages = await session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(func.crc32(func.concat(
+                    SupportGroupLanguage.group_id, ":", SupportGroupLanguage.language_code
+                ))), 0)
+            )
+        )
+        return tuple(groups.one()) + tuple(languages.one())
+
+
 async def get_all_groups_with_languages():
     async with async_session() as session:
         result = await session.execute(
@@ -265,4 +392,203 @@ async def get_request_messages(request_id: int) -> list[SupportRequestMessage]:
             select(SupportRequestMessage)
             .where(SupportRequestMessage.request_id == request_id)
         )
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+async def save_request_messages(rows: list[dict]):
+    """
+    Сохраняет метаданные сообщений рассылки одним INSERT.
+    """
+    if not rows:
+        return
+    async with async_session() as session:
+        await session.execute(insert(SupportRequestMessage), rows)
+        await session.commit()
+
+
+async def get_cached_translation(text_hash: str, target_lang: str, model: str) -> Optional[str]:
+    try:
+        async with async_session() as session:
+            result = await session.execute(
+                select(TranslationCacheEntry.translated).where(
+                    TranslationCacheEntry.text_hash == text_hash,
+                    TranslationCacheEntry.target_lang == target_lang,
+                    TranslationCacheEntry.model == model
+                )
+            )
+            return result.scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Error in get_cached_translation({text_hash}, {target_lang}): {e}")
+        return None
+
+async def save_cached_translation(text_hash: str, target_lang: str, model: str, translated: str):
+    try:
+        async with async_session() as session:
+            stmt = insert(TranslationCacheEntry).values(
+                text_hash=text_hash,
+                target_lang=target_lang,
+                model=model,
+                translated=translated,
+            ).on_duplicate_key_update(translated=translated)
+            await session.execute(stmt)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Error in save_cached_translation({text_hash}, {target_lang}): {e}")
+
+
+async def get_transcript_page(
+    request_id: int,
+    after_id: int = 0,
+    limit: int = TRANSCRIPT_PAGE_SIZE
+) -> tuple[list[MessageSnapshot], Optional[int]]:
+    """
+    Страница переписки по ключу (request_id, id): сообщения с id > after_id.
+    Возвращает (сообщения, курсор следующей страницы или None).
+
+    Запрос переносится в архив целиком в одной транзакции, поэтому если
+    в горячей таблице страница пуста — переписка (если есть) в архиве.
+    """
+    async with async_session() as session:
+        for model in (MessageHistory, ArchivedMessage):
+            result = await session.execute(
+                select(*columns(model, MessageSnapshot))
+                .where(model.request_id == request_id, model.id > after_id)
+                .order_by(model.id)
+                .limit(limit)
+            )
+            messages = [MessageSnapshot(*row) for row in result.all()]
+            if messages:
+                break
+    next_cursor = messages[-1].id if len(messages) == limit else None
+    return messages, next_cursor
+
+
+async def iter_transcript(request_id: int, page_size: int = TRANSCRIPT_PAGE_SIZE) -> AsyncIterator[MessageSnapshot]:
+    """
+    Вся переписка запроса по страницам; соединение между страницами не держится.
+    """
+    cursor = 0
+    while cursor is not None:
+        messages, cursor = await get_transcript_page(request_id, cursor, page_size)
+        for message in messages:
+            yield message
+
+
+async def get_request_id_range(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    archived: bool = False
+) -> tuple[Optional[int], Optional[int]]:
+    model = ArchivedRequest if archived else SupportRequest
+    query = select(func.min(model.id), func.max(model.id))
+    if since:
+        query = query.where(model.created_at >= since)
+    if until:
+        query = query.where(model.created_at < until)
+    async with async_session() as session:
+        result = await session.execute(query)
+        return tuple(result.one())
+
+
+async def stream_requests(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    archived: bool = False
+) -> AsyncIterator[RequestSnapshot]:
+    """
+    Запросы по возрастанию id через серверный курсор (archived — из архива).
+    """
+    model = ArchivedRequest if archived else SupportRequest
+    query = select(*columns(model, RequestSnapshot)).order_by(model.id)
+    if since:
+        query = query.where(model.created_at >= since)
+    if until:
+        query = query.where(model.created_at < until)
+
+    async with async_session() as session:
+        result = await session.stream(query.execution_options(yield_per=TRANSCRIPT_PAGE_SIZE))
+        async for row in result:
+            yield RequestSnapshot(*row)
+
+
+async def stream_messages(
+    from_request_id: int,
+    to_request_id: int,
+    archived: bool = False
+) -> AsyncIterator[MessageSnapshot]:
+    """
+    Сообщения запросов из диапазона id по (request_id, id) через серверный курсор.
+    """
+    model = ArchivedMessage if archived else MessageHistory
+    async with async_session() as session:
+        result = await session.stream(
+            select(*columns(model, MessageSnapshot))
+            .where(model.request_id.between(from_request_id, to_request_id))
+            .order_by(model.request_id, model.id)
+            .execution_options(yield_per=TRANSCRIPT_PAGE_SIZE)
+        )
+        async for row in result:
+            yield MessageSnapshot(*row)
+
+
+# Пары (горячая таблица, архивная) в порядке вставки; удаляются в обратном
+_ARCHIVE_TABLES = [
+    (SupportRequest, ArchivedRequest),
+    (SupportRequestMessage, ArchivedRequestMessage),
+    (MessageHistory, ArchivedMessage),
+]
+
+
+async def archive_closed_requests(closed_before: datetime, limit: int) -> int:
+    """
+    Переносит до limit запросов, закрытых раньше closed_before, вместе с
+    перепиской и метаданными рассылки в *_archive таблицы. Одна транзакция:
+    INSERT ... SELECT в архив и DELETE из горячих таблиц. Строки,
+    заблокированные другим процессом, пропускаются (SKIP LOCKED).
+    Возвращает число перенесённых запросов.
+
+    Архив хранит id горячих таблиц. До MySQL 8.0 AUTO_INCREMENT после
+    рестарта сбрасывается в MAX(id)+1, поэтому строки с наибольшим id
+    (запрос и запрос последнего сообщения) не переносятся: иначе их id
+    выдали бы снова. Запросы, чей id в архиве уже занят, остаются на месте.
+    """
+    async with async_session() as session:
+        newest = [
+            (await session.execute(select(func.max(SupportRequest.id)))).scalar(),
+            (await session.execute(
+                select(MessageHistory.request_id).order_by(MessageHistory.id.desc()).limit(1)
+            )).scalar(),
+        ]
+        result = await session.execute(
+            select(SupportRequest.id)
+            .where(
+                SupportRequest.status == "closed",
+                SupportRequest.closed_at < closed_before,
+                SupportRequest.id.not_in([request_id for request_id in newest if request_id is not None])
+            )
+            .order_by(SupportRequest.closed_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        ids = result.scalars().all()
+
+        taken = set((await session.execute(
+            select(ArchivedRequest.id).where(ArchivedRequest.id.in_(ids))
+        )).scalars()) if ids else set()
+        if taken:
+            logger.error(f"Архив: id {sorted(taken)} уже заняты, запросы оставлены в горячих таблицах")
+            ids = [request_id for request_id in ids if request_id not in taken]
+        if not ids:
+            return 0
+
+        for hot, cold in _ARCHIVE_TABLES:
+            key = hot.id if hot is SupportRequest else hot.request_id
+            names = [column.name for column in hot.__table__.columns]
+            await session.execute(
+                insert(cold).from_select(names, select(*hot.__table__.columns).where(key.in_(ids)))
+            )
+        for hot, _ in reversed(_ARCHIVE_TABLES):
+            key = hot.id if hot is SupportRequest else hot.request_id
+            await session.execute(delete(hot).where(key.in_(ids)))
+
+        await session.commit()
+        return len(ids)
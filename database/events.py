@@ -0,0 +1,28 @@
+# database/events.py
+from collections import defaultdict
+from typing import Awaitable, Callable
+from utils.logger import logger
+
+# Шина событий изменения данных: crud публикует, кеши подписываются.
+#   user_changed     (user_id)
+#   request_changed  (request_id, user_id, moderator_id)
+#   groups_changed   (group_id; None — неизвестно, какая группа)
+_subscribers: dict[str, list[Callable[..., Awaitable[None]]]] = defaultdict(list)
+
+
+def on(event: str):
+    """
+    Декоратор подписки: @events.on("user_changed")
+    """
+    def decorator(handler: Callable[..., Awaitable[None]]):
+        _subscribers[event].append(handler)
+        return handler
+    return decorator
+
+
+async def publish(event: str, **payload):
+    for handler in _subscribers.get(event, []):
+        try:
+            await handler(**payload)
+        except Exception as e:
+            logger.error(f"Error in {event} subscriber {handler.__name__}: {e}")
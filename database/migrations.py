@@ -0,0 +1,165 @@
+# database/migrations.py
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Index, MetaData, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from database.base import engine
+from utils.logger import logger
+
+# Учёт применённых миграций
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("id", String(100), primary_key=True),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+# Миграции идемпотентны: на свежей базе (init_db → create_all) нужные
+# колонки и индексы уже есть, и миграция просто отмечается применённой.
+MIGRATIONS: list[tuple[str, Callable[[Connection], None]]] = []
+
+
+def migration(migration_id: str):
+    def decorator(func: Callable[[Connection], None]):
+        MIGRATIONS.append((migration_id, func))
+        return func
+    return decorator
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def _has_index(conn: Connection, table: str, index: str) -> bool:
+    return any(idx["name"] == index for idx in inspect(conn).get_indexes(table))
+
+
+def _create_index(conn: Connection, table: str, index: str, columns: str):
+    if not _has_index(conn, table, index):
+        conn.execute(text(f"CREATE INDEX {index} ON {table} ({columns})"))
+
+
+@migration("0001_translations_updated_at")
+def _translations_updated_at(conn: Connection):
+    if not _has_column(conn, "translations", "updated_at"):
+        conn.execute(text("ALTER TABLE translations ADD COLUMN updated_at DATETIME NULL"))
+    _create_index(conn, "translations", "ix_translations_updated_at", "updated_at")
+
+
+@migration("0002_hot_path_indexes")
+def _hot_path_indexes(conn: Connection):
+    _create_index(conn, "support_requests", "ix_support_requests_user_status", "user_id, status")
+    _create_index(conn, "support_requests", "ix_support_requests_moderator_status", "assigned_moderator_id, status")
+    _create_index(conn, "message_history", "ix_message_history_request_id_id", "request_id, id")
+
+
+# Схема архива на момент миграции 0003. Копия, а не модели из models.py:
+# их дальнейшие правки не должны менять то, что создаёт уже выпущенная миграция
+_archive_metadata = MetaData()
+Table(
+    "support_requests_archive",
+    _archive_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("user_id", BigInteger),
+    Column("assigned_moderator_id", BigInteger, nullable=True),
+    Column("status", String(20)),
+    Column("language", String(3)),
+    Column("created_at", DateTime),
+    Column("taken_at", DateTime, nullable=True),
+    Column("closed_at", DateTime, nullable=True),
+    Column("archived_at", DateTime, server_default=func.now()),
+    Index("ix_support_requests_archive_user_id", "user_id"),
+    Index("ix_support_requests_archive_created_at", "created_at"),
+)
+Table(
+    "support_request_messages_archive",
+    _archive_metadata,
+    Column("request_id", Integer, primary_key=True),
+    Column("chat_id", BigInteger, primary_key=True),
+    Column("message_id", BigInteger, nullable=False),
+    Column("text", Text, nullable=True),
+    Column("caption", Text, nullable=True),
+    Column("photo_file_id", String(255), nullable=True),
+)
+Table(
+    "message_history_archive",
+    _archive_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("request_id", Integer),
+    Column("sender_id", BigInteger),
+    Column("text", Text, nullable=True),
+    Column("photo_file_id", String(255), nullable=True),
+    Column("caption", Text, nullable=True),
+    Column("timestamp", DateTime),
+    Index("ix_message_history_archive_request_id_id", "request_id", "id"),
+)
+
+
+@migration("0003_archive_tables")
+def _archive_tables(conn: Connection):
+    _archive_metadata.create_all(conn, checkfirst=True)
+    _create_index(conn, "support_requests", "ix_support_requests_status_closed_at", "status, closed_at")
+
+
+@migration("0004_translations_updated_at_server_side")
+def _translations_updated_at_server_side(conn: Connection):
+    # 0001 добавляет колонку без DEFAULT/ON UPDATE: правки из админки
+    # её не обновляли бы. Отметку ставит БД при любой записи
+    conn.execute(text("UPDATE translations SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+    conn.execute(text(
+        "ALTER TABLE translations MODIFY COLUMN updated_at DATETIME NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+    ))
+
+
+# Схема кеша переводов на момент миграции 0005 (как и архив для 0003)
+_translation_cache = Table(
+    "translation_cache",
+    MetaData(),
+    Column("text_hash", String(64), primary_key=True),
+    Column("target_lang", String(50), primary_key=True),
+    Column("model", String(50), primary_key=True),
+    Column("translated", Text, nullable=False),
+    Column("created_at", DateTime),
+)
+
+
+@migration("0005_translation_cache_table")
+def _translation_cache_table(conn: Connection):
+    # Таблица кеша переводов появилась раньше миграций: на уже развёрнутых
+    # базах её создавал только init_db
+    _translation_cache.create(conn, checkfirst=True)
+
+
+def _apply_pending(conn: Connection) -> list[str]:
+    # Бот применяет миграции при старте: несколько процессов не должны
+    # делать это одновременно
+    if conn.execute(text("SELECT GET_LOCK('schema_migrations', 60)")).scalar() != 1:
+        raise RuntimeError("Миграции уже применяет другой процесс")
+    try:
+        return _apply_locked(conn)
+    finally:
+        conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+
+
+def _apply_locked(conn: Connection) -> list[str]:
+    _metadata.create_all(conn)
+    applied = set(conn.execute(select(schema_migrations.c.id)).scalars())
+    done = []
+    for migration_id, func in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        func(conn)
+        conn.execute(schema_migrations.insert().values(id=migration_id, applied_at=datetime.utcnow()))
+        logger.info(f"Migration {migration_id} applied")
+        done.append(migration_id)
+    return done
+
+
+async def run_migrations() -> list[str]:
+    """
+    Применяет все неприменённые миграции по порядку. Возвращает их id.
+    """
+    async with engine.begin() as conn:
+        return await conn.run_sync(_apply_pending)
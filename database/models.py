@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Boolean, Index, FetchedValue, func, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import List
@@ -24,6 +24,13 @@ class User(Base):
 
 class SupportRequest(Base):
     __tablename__ = "support_requests"
+    __table_args__ = (
+        # get_active_request_by_user / get_active_request_by_moderator
+        Index("ix_support_requests_user_status", "user_id", "status"),
+        Index("ix_support_requests_moderator_status", "assigned_moderator_id", "status"),
+        # архивация: закрытые раньше порога
+        Index("ix_support_requests_status_closed_at", "status", "closed_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"))
@@ -65,6 +72,10 @@ class SupportRequestMessage(Base):
 
 class MessageHistory(Base):
     __tablename__ = "message_history"
+    __table_args__ = (
+        # get_initial_message: первое сообщение запроса без сортировки
+        Index("ix_message_history_request_id_id", "request_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     request_id = Column(Integer, ForeignKey("support_requests.id"))
@@ -76,6 +87,55 @@ class MessageHistory(Base):
 
     request = relationship("SupportRequest", back_populates="messages")
 
+# Холодное хранилище: закрытые давно запросы переносятся сюда вместе с
+# перепиской (services/archive.py), чтобы горячие таблицы и их индексы
+# оставались маленькими. Колонки совпадают с горячими таблицами.
+
+class ArchivedRequest(Base):
+    __tablename__ = "support_requests_archive"
+    __table_args__ = (
+        Index("ix_support_requests_archive_user_id", "user_id"),
+        Index("ix_support_requests_archive_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(BigInteger)
+    assigned_moderator_id = Column(BigInteger, nullable=True)
+    status = Column(String(20))
+    language = Column(String(3))
+    created_at = Column(DateTime)
+    taken_at = Column(DateTime, nullable=True)
+    closed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, server_default=func.now())
+
+class ArchivedRequestMessage(Base):
+    __tablename__ = "support_request_messages_archive"
+
+    request_id = Column(Integer, primary_key=True)
+    chat_id = Column(BigInteger, primary_key=True)
+    message_id = Column(BigInteger, nullable=False)
+    text = Column(Text, nullable=True)
+    caption = Column(Text, nullable=True)
+    photo_file_id = Column(String(255), nullable=True)
+
+class ArchivedMessage(Base):
+    __tablename__ = "message_history_archive"
+    __table_args__ = (
+        Index("ix_message_history_archive_request_id_id", "request_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    request_id = Column(Integer)
+    sender_id = Column(BigInteger)
+    text = Column(Text, nullable=True)
+    photo_file_id = Column(String(255), nullable=True)
+    caption = Column(Text, nullable=True)
+    timestamp = Column(DateTime)
+
+# MySQL: отметка времени, которую БД обновляет сама при любом UPDATE
+CURRENT_TIMESTAMP_ON_UPDATE = text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+
+
 class Translation(Base):
     __tablename__ = "translations"
 
@@ -83,6 +143,25 @@ class Translation(Base):
     key = Column(String(100), index=True)
     lang = Column(String(3))
     text = Column(Text)
+    # Для дозагрузки изменённых строк без перечитывания всей таблицы.
+    # Ставит сама БД, чтобы учитывались и правки из админки
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=CURRENT_TIMESTAMP_ON_UPDATE,
+        server_onupdate=FetchedValue(),
+        index=True
+    )
+
+
+class TranslationCacheEntry(Base):
+    __tablename__ = "translation_cache"
+
+    text_hash = Column(String(64), primary_key=True)   # sha256 нормализованного текста
+    target_lang = Column(String(50), primary_key=True) # язык перевода (как в промпте)
+    model = Column(String(50), primary_key=True)       # модель, сделавшая перевод
+    translated = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class Language(Base):
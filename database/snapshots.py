@@ -0,0 +1,51 @@
+# database/snapshots.py
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+
+# Компактные неизменяемые снимки строк для кеша: без состояния сессии,
+# relationship-прокси и ленивых загрузок. Строятся прямо из выборки колонок.
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    id: int
+    username: str | None
+    full_name: str | None
+    language_code: str | None
+    role: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class RequestSnapshot:
+    id: int
+    user_id: int
+    assigned_moderator_id: int | None
+    status: str
+    language: str
+    created_at: datetime | None
+    taken_at: datetime | None
+    closed_at: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class MessageSnapshot:
+    id: int
+    request_id: int
+    sender_id: int
+    text: str | None
+    caption: str | None
+    photo_file_id: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class SupportGroupSnapshot:
+    id: int
+    title: str
+    photo_url: str | None
+
+
+def columns(model, snapshot_cls) -> list:
+    """
+    Колонки модели в порядке полей снимка: select(*columns(User, UserSnapshot)).
+    """
+    return [getattr(model, field.name) for field in fields(snapshot_cls)]
@@ -0,0 +1,25 @@
+# export_transcripts.py
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from services.export import export_transcripts
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Выгрузка запросов с перепиской")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created_at >= (ISO)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created_at < (ISO)")
+    parser.add_argument("--output", help="файл (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            count = await export_transcripts(out, args.format, args.since, args.until)
+    else:
+        count = await export_transcripts(sys.stdout, args.format, args.since, args.until)
+    print(f"✅ Exported {count} requests", file=sys.stderr)
+
+if __name__ == "__main__":
+    asyncio.run(main())
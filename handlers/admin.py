@@ -6,6 +6,9 @@ from services.cache import(
     get_support_group_cached
 )  
 from database.models import SupportGroup
+from services.openai import get_translation_health
+from services import history_writer
+import json
 
 admin_router = Router()
 
@@ -43,4 +46,29 @@ async def add_group_cmd(message: types.Message):
     if exists:
         await message.reply("🔄 Группа уже была зарегистрирована, данные обновлены.")
     else:
-        await message.reply("✅ Группа успешно зарегистрирована.")
\ No newline at end of file
+        await message.reply("✅ Группа успешно зарегистрирована.")
+
+@admin_router.message(Command("translation_status"))
+async def translation_status_cmd(message: types.Message):
+    user = await get_user_cached(message.from_user.id)
+
+    if not user or user.role != "admin":
+        return await message.reply("❌ У вас нет доступа к этой команде.")
+
+    health = get_translation_health()
+    await message.reply(
+        f"<pre>{json.dumps(health, ensure_ascii=False, indent=2)}</pre>"
+    )
+
+
+@admin_router.message(Command("history_status"))
+async def history_status_cmd(message: types.Message):
+    user = await get_user_cached(message.from_user.id)
+
+    if not user or user.role != "admin":
+        return await message.reply("❌ У вас нет доступа к этой команде.")
+
+    stats = history_writer.get_stats()
+    await message.reply(
+        f"<pre>{json.dumps(stats, ensure_ascii=False, indent=2)}</pre>"
+    )
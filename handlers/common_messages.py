@@ -3,12 +3,19 @@
 from aiogram import Router, F
 from aiogram.types import Message, ContentType, ReplyKeyboardRemove
 from aiogram.enums import ChatType
+from aiogram.utils.chat_action import ChatActionSender
 from database import crud
-from config import SUPPORT_GROUP_RU_ID, SUPPORT_GROUP_EN_ID
+from config import (
+    SUPPORT_GROUP_RU_ID,
+    SUPPORT_GROUP_EN_ID,
+    CHAT_ACTION_INTERVAL,
+    TRANSLATION_STREAMING,
+    TRANSLATION_STREAM_MIN_CHARS
+)
 from utils.logger import logger
 from services.i18n import t
-from services import openai
-from handlers.start import get_main_keyboard
+from services import openai, history_writer
+from keyboards.registry import main_keyboard
 from services.cache import (
     get_user_cached,
     get_active_request_by_user_cached,
@@ -17,7 +24,6 @@ from services.cache import (
     get_language_name_cached
 )
 import asyncio
-from aiocache import caches
 
 router = Router()
 
@@ -65,9 +71,8 @@ async def unified_handler(message: Message):
             await message.answer(confirm, reply_markup=ReplyKeyboardRemove())
 
             notify = await t("request_closed", req.language)
-            kb = await get_main_keyboard(req.language)
+            kb = main_keyboard(req.language)
             await message.bot.send_message(req.user_id, notify, reply_markup=kb)
-            await caches.get("default").delete(f"get_active_request_by_moderator_cached:{sender.id}")
             return
 
         # Получатель — пользователь
@@ -86,45 +91,49 @@ async def unified_handler(message: Message):
     else:
         return  # неизвестная роль
 
-    # ======= Показ "печатает/отправляет" =======
+    # ======= ПЕРЕВОД под индикатором "печатает/отправляет" =======
+    # ChatActionSender шлёт действие в фоне и обновляет его, пока идёт перевод
     action = "upload_photo" if message.photo else "typing"
-    await message.bot.send_chat_action(recipient.id, action=action)
-
-
-    # ======= ПЕРЕВОД и СБОРКА =======
-
-    if sender_lang != recipient_lang:
-        languages = await get_language_name_cached()
-        lang_name = next(
-            (l["name_ru"] for l in languages if l["code"] == recipient_lang),
-            recipient_lang
-        )
-        translated_text = await openai.translate_with_gpt(
-            text=original_text,
-            lang_name=lang_name
-        )
-        message_to_send = translated_text
-        combined_text = f"{original_text}\n\n{translated_text}"
-    else:
-        message_to_send = original_text
-        combined_text = original_text
-
-    # ======= ОТПРАВКА =======
-
-    if message.photo:
-        await message.bot.send_photo(
-            recipient.id,
-            photo=message.photo[-1].file_id,
-            caption=message_to_send
-        )
-    else:
-        await message.bot.send_message(
-            recipient.id,
-            text=message_to_send
-        )
-
-    # ======= СОХРАНЕНИЕ В БАЗУ =======
-    await crud.save_message(
+    streamed = False
+    async with ChatActionSender(
+        bot=message.bot,
+        chat_id=recipient.id,
+        action=action,
+        interval=CHAT_ACTION_INTERVAL
+    ):
+        if sender_lang != recipient_lang:
+            languages = await get_language_name_cached()
+            lang_name = next(
+                (l["name_ru"] for l in languages if l["code"] == recipient_lang),
+                recipient_lang
+            )
+            if (
+                TRANSLATION_STREAMING
+                and not message.photo
+                and len(original_text) >= TRANSLATION_STREAM_MIN_CHARS
+            ):
+                # Длинный текст: перевод появляется у получателя по мере генерации
+                translated_text = await openai.translate_streaming(
+                    message.bot,
+                    recipient.id,
+                    text=original_text,
+                    lang_name=lang_name
+                )
+                streamed = True
+            else:
+                translated_text = await openai.translate_with_gpt(
+                    text=original_text,
+                    lang_name=lang_name
+                )
+            message_to_send = translated_text
+            combined_text = f"{original_text}\n\n{translated_text}"
+        else:
+            message_to_send = original_text
+            combined_text = original_text
+
+    # ======= ОТПРАВКА и СОХРАНЕНИЕ В БАЗУ — параллельно =======
+
+    save = history_writer.save_message(
         request_id=req.id,
         sender_id=sender.id,
         text=combined_text if not message.photo else None,
@@ -132,4 +141,25 @@ async def unified_handler(message: Message):
         photo_file_id=message.photo[-1].file_id if message.photo else None
     )
 
+    if streamed:
+        # Сообщение уже отправлено при стриминге
+        await save
+    elif message.photo:
+        await asyncio.gather(
+            message.bot.send_photo(
+                recipient.id,
+                photo=message.photo[-1].file_id,
+                caption=message_to_send
+            ),
+            save
+        )
+    else:
+        await asyncio.gather(
+            message.bot.send_message(
+                recipient.id,
+                text=message_to_send
+            ),
+            save
+        )
+
     logger.info(f"{role.capitalize()} message forwarded: from {sender.id} to {recipient.id}, req_id={req.id}")
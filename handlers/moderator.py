@@ -1,20 +1,21 @@
 # handlers/moderator.py
 
+import asyncio
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-from aiogram.exceptions import TelegramBadRequest
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 from database import crud
-from services.i18n import t
+from services.i18n import t, render
 from utils.logger import logger
 from services import openai
+from services.broadcast import AnnouncementEdit, schedule_edits
+from services.routing import get_routing
+from keyboards.registry import close_keyboard
 from services.cache import (
     get_user_cached,
     get_active_request_by_moderator_cached,
     get_initial_message_cached,
-    get_request_by_id_cached,
     t_cached,
-    get_all_groups_with_languages_cached,
     get_language_name_cached
 )
 
@@ -40,22 +41,61 @@ async def take_request(callback: CallbackQuery):
         await callback.answer(text, show_alert=True)
         return
 
-    # Пробуем назначить модератора
-    updated = await crud.assign_request_to_moderator(request_id, moderator.id)
-    if not updated:
+    # Пробуем назначить модератора (атомарно; получаем обновлённый запрос)
+    req = await crud.assign_request_to_moderator(request_id, moderator.id)
+    if not req:
         text = await t_cached("already_in_progress", moderator.language_code)
         await callback.answer(text, show_alert=True)
         return
 
-    # Уведомляем модератора и отправляем клавиатуру
+    # Отвечаем на callback сразу, чтобы не упереться в таймаут Telegram
     lang = moderator.language_code
+    success_text = await t_cached("taken_success", lang)
+    await callback.answer(success_text)
+
+    # Сразу обновляем анонсы в группах: добавляем информацию о том, кто взял,
+    # чтобы другие модераторы не жали кнопку, пока идут перевод и отправка.
+    # Получаем все сообщения запроса. Рассылка пишет их одним INSERT сразу
+    # после отправки: если кнопку нажали раньше, недолго ждём эту запись
+    all_messages = await crud.get_request_messages(request_id)
+    for _ in range(5):
+        if all_messages:
+            break
+        await asyncio.sleep(0.2)
+        all_messages = await crud.get_request_messages(request_id)
+
+    accepted_group_title = get_routing().group_titles.get(clicked_chat_id, "Группа")
+
+    # Обновляем все сообщения во всех группах (в фоне, с лимитом на чат)
+    edits = []
+    for msg in all_messages:
+        if msg.chat_id == clicked_chat_id:
+            # Текущая группа: вставляем имя модератора
+            taken_text = render(
+                "taken_by",
+                req.language,
+                moderator=f"@{moderator.username}" if moderator.username else str(moderator.id)
+            )
+        else:
+            # Остальные группы: вставляем название группы
+            taken_text = render(
+                "taken_by",
+                req.language,
+                moderator=f"✅ {accepted_group_title}"
+            )
+        original_text = msg.caption or msg.text or ""
+        edits.append(AnnouncementEdit(
+            chat_id=msg.chat_id,
+            message_id=msg.message_id,
+            text=f"{original_text}\n\n{taken_text}",
+            is_photo=bool(msg.photo_file_id)
+        ))
+
+    schedule_edits(callback.bot, edits)
+
+    # Уведомляем модератора и отправляем клавиатуру
     mod_msg = await t_cached("you_assigned", lang)
-    close_text = await t_cached("close_button", lang)
-    mod_kb = ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text=close_text)]],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
+    mod_kb = close_keyboard(lang)
     await callback.bot.send_message(
         moderator.id,
         mod_msg,
@@ -65,10 +105,9 @@ async def take_request(callback: CallbackQuery):
 
     # Получаем оригинал сообщения
     initial = await get_initial_message_cached(request_id)
-    original_text = initial.caption or initial.text or ""
+    original_text = (initial.caption or initial.text or "") if initial else ""
 
-    # Получаем язык пользователя
-    req = await get_request_by_id_cached(request_id)
+    # Язык пользователя
     user_lang = req.language
     mod_lang = moderator.language_code
 
@@ -88,7 +127,7 @@ async def take_request(callback: CallbackQuery):
         final_text = f"{original_text}\n\n{translated}"
 
     # Отправляем
-    if initial.photo_file_id:
+    if initial and initial.photo_file_id:
         await callback.bot.send_photo(
             moderator.id,
             photo=initial.photo_file_id,
@@ -101,8 +140,6 @@ async def take_request(callback: CallbackQuery):
         )
 
     # Уведомляем пользователя о подключении модератора
-    req = await get_request_by_id_cached(request_id)
-    user_lang = req.language
     connected_text = await t_cached("moderator_connected", user_lang)
     await callback.bot.send_message(
         req.user_id,
@@ -110,73 +147,3 @@ async def take_request(callback: CallbackQuery):
         reply_markup=ReplyKeyboardRemove()
     )
 
-    # Обновляем сообщение в группе: добавляем информацию о том, кто взял
-    template = await t_cached("taken_by", user_lang)
-
-    # Получаем все сообщения запроса
-    all_messages = await crud.get_request_messages(request_id)
-
-    # Получаем список всех групп и названий
-    groups = await get_all_groups_with_languages_cached()
-    group_title_map = {
-        group["group_id"]: group["group_name"]
-        for group in groups
-    }
-    accepted_group_title = group_title_map.get(clicked_chat_id, "Группа")
-
-    # Обновляем все сообщения во всех группах
-    for msg in all_messages:
-        try:
-            if msg.chat_id == clicked_chat_id:
-                # Текущая группа: вставляем имя модератора
-                taken_text = template.replace(
-                    "{moderator}",
-                    f"@{moderator.username}" if moderator.username else str(moderator.id)
-                )
-                original_text = msg.caption or msg.text or ""
-                updated_text = f"{original_text}\n\n{taken_text}"
-
-                if msg.photo_file_id:
-                    await callback.bot.edit_message_caption(
-                        chat_id=msg.chat_id,
-                        message_id=msg.message_id,
-                        caption=updated_text,
-                        reply_markup=None
-                    )
-                else:
-                    await callback.bot.edit_message_text(
-                        chat_id=msg.chat_id,
-                        message_id=msg.message_id,
-                        text=updated_text,
-                        reply_markup=None
-                    )
-            else:
-                # Остальные группы: вставляем название группы
-                taken_text = template.replace(
-                    "{moderator}",
-                    f"✅ {accepted_group_title}"
-                )
-                original_text = msg.caption or msg.text or ""
-                updated_text = f"{original_text}\n\n{taken_text}"
-
-                if msg.photo_file_id:
-                    await callback.bot.edit_message_caption(
-                        chat_id=msg.chat_id,
-                        message_id=msg.message_id,
-                        caption=updated_text,
-                        reply_markup=None
-                    )
-                else:
-                    await callback.bot.edit_message_text(
-                        chat_id=msg.chat_id,
-                        message_id=msg.message_id,
-                        text=updated_text,
-                        reply_markup=None
-                    )
-        except TelegramBadRequest as e:
-            if "message is not modified" not in str(e):
-                logger.warning(f"⚠ Не удалось обновить сообщение в чате {msg.chat_id}: {e}")
-
-    # Ответ модератору
-    success_text = await t_cached("taken_success", lang)
-    await callback.answer(success_text)
@@ -9,10 +9,11 @@ from aiogram.types import (
     CallbackQuery,
 )
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from services.i18n import t, load_translations
+from services.i18n import t, render, reload_translations_everywhere
 from database import crud
 from utils.logger import logger
-from services.cache import get_user_cached, get_language_keyboard, get_main_keyboard, get_active_request_by_user_cached
+from services.cache import get_user_cached, get_active_request_by_user_cached
+from keyboards.registry import main_keyboard, language_keyboard
 import asyncio
 
 router = Router()
@@ -34,7 +35,7 @@ async def cmd_start(message: Message):
 
     if user.language_code:
         lang = user.language_code
-        greeting = (await t("welcome_back", lang)).replace("\\n", "\n")
+        greeting = render("welcome_back", lang)
 
         # Проверяем роль
         if user.role not in ("admin", "moderator"):
@@ -43,12 +44,12 @@ async def cmd_start(message: Message):
                 notice = await t("you_have_active_request", lang)
                 await message.answer(notice)
             else:
-                kb = await get_main_keyboard(lang)
+                kb = main_keyboard(lang)
                 await message.answer(greeting, reply_markup=kb)
         else:
             await message.answer(greeting)
     else:
-        lang_kb = await get_language_keyboard()
+        lang_kb = await language_keyboard()
         await message.answer(
             "Выберите язык / Choose your language:",
             reply_markup=lang_kb
@@ -66,7 +67,7 @@ async def cmd_reload_translations(message: Message):
         logger.warning(f"Unauthorized /reload_translations attempt by {message.from_user.id}")
         return
 
-    await load_translations()
+    await reload_translations_everywhere()
     await message.answer("✅ Переводы успешно обновлены.")
     logger.info(f"Moderator {message.from_user.id} reloaded translations")
 
@@ -81,7 +82,7 @@ async def language_selected(callback: CallbackQuery):
 
     lang_text = await t("language_selected", lang)
     await callback.message.edit_text(lang_text, reply_markup=None)
-    info_text = (await t("welcome_info", lang)).replace("\\n", "\n")
-    kb   = await get_main_keyboard(lang)
+    info_text = render("welcome_info", lang)
+    kb   = main_keyboard(lang)
     await callback.message.answer(info_text, reply_markup=kb)
     await callback.answer()
@@ -8,18 +8,20 @@ from keyboards.inline import take_request_kb
 from utils.logger import logger
 
 from database import crud
-from services.i18n import support_triggers, t
+from services.i18n import is_support_trigger, t, render
 from services import openai
+from services.broadcast import broadcast_request
 
 import asyncio
-from services.cache import get_user_cached, get_all_groups_with_languages_cached
+from services.cache import get_user_cached
+from services.routing import get_routing
 
 router = Router()
 
 class SupportRequestStates(StatesGroup):
     waiting_for_message = State()
 
-@router.message(F.text.in_(support_triggers))
+@router.message(F.text.func(is_support_trigger))
 async def request_support(message: Message, state: FSMContext):
     user = await get_user_cached(message.from_user.id)
     logger.info(f"User {message.from_user.id} started support request process")
@@ -57,38 +59,31 @@ async def receive_request(message: Message, state: FSMContext):
     caption = message.caption if message.caption else None
 
     # фильтрация мусора: если вообще ничего не пришло — не сохраняем
+    # Первое сообщение пишется сразу, до рассылки: take_request читает его,
+    # возможно, в другом процессе, и очередь записи оттуда не видна
     if text or caption:
-        asyncio.create_task(
-            crud.save_message(
-                request_id=request.id,
-                sender_id=user.id,
-                text=text,
-                caption=caption,
-                photo_file_id=photo_id
-            )
+        await crud.save_message(
+            request_id=request.id,
+            sender_id=user.id,
+            text=text,
+            caption=caption,
+            photo_file_id=photo_id
         )
     logger.info(f"New support request created: req_id={request.id}, user_id={user.id}")
 
     # Формируем текст на языке пользователя
-    request_text = await t("new_request_text", user.language_code)
-    request_text = request_text.replace("\\n", "\n").replace("{text}", message.text or message.caption or "")
+    request_text = render("new_request_text", user.language_code, text=message.text or message.caption or "")
 
     # Клавиатура
-    kb = await take_request_kb(request.id, user.language_code)
+    kb = take_request_kb(request.id, user.language_code)
 
-    # Получаем все группы с этим языком
+    # Группы с этим языком — из готовой таблицы маршрутизации
     try:
-        all_groups = await get_all_groups_with_languages_cached()
-        user_groups = [
-            group for group in all_groups
-            if user.language_code in group["languages"]
-        ]
-
-        # Ищем среди них одну группу, в которой есть и ru
-        group_with_ru = next(
-            (group for group in user_groups if "ru" in group["languages"]),
-            None
-        )
+        routing = get_routing()
+        user_groups = routing.groups_by_language.get(user.language_code, ())
+
+        # Группа, в которой есть и ru
+        group_with_ru = routing.ru_group_by_language.get(user.language_code)
 
         # Получаем перевод, если он нужен
         translated = ""
@@ -98,44 +93,26 @@ async def receive_request(message: Message, state: FSMContext):
                 lang_name="Русский"
             )
 
-        # Рассылка
-        for group in user_groups:
-            group_id = group["group_id"]
+        # Рассылка: тексты для каждой группы, отправка параллельно
+        texts = {}
+        for group_id in user_groups:
             final_text = request_text
 
-            if group_with_ru and group_id == group_with_ru["group_id"] and translated:
+            if group_id == group_with_ru and translated:
                 final_text = f"{request_text}\n\n{translated}"
 
-            if message.photo:
-                msg = await message.bot.send_photo(
-                    group_id,
-                    photo=message.photo[-1].file_id,
-                    caption=final_text,
-                    reply_markup=kb
-                )
-                await crud.save_request_message(
-                    request_id=request.id,
-                    chat_id=group_id,
-                    message_id=msg.message_id,
-                    caption=final_text,
-                    photo_file_id=message.photo[-1].file_id
-                )
-            else:
-                msg = await message.bot.send_message(
-                    group_id,
-                    final_text,
-                    reply_markup=kb
-                )
-                await crud.save_request_message(
-                    request_id=request.id,
-                    chat_id=group_id,
-                    message_id=msg.message_id,
-                    text=final_text
-                )
+            texts[group_id] = final_text
+
+        await broadcast_request(
+            message.bot,
+            request.id,
+            texts,
+            photo_file_id=photo_id,
+            reply_markup=kb
+        )
 
         # Подтверждение пользователю
-        request_sent = await t("request_sent", user.language_code)
-        request_sent = request_sent.replace("\\n", "\n")
+        request_sent = render("request_sent", user.language_code)
         await message.answer(request_sent, reply_markup=ReplyKeyboardRemove())
         await state.clear()
     except Exception as e:
@@ -2,6 +2,7 @@
 import asyncio
 from database.base import engine
 from database.models import Base
+from database.migrations import run_migrations
 
 from config import DB_URL
 print("🔎 DB_URL from .env =", DB_URL)
@@ -10,6 +11,8 @@ async def init():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     print("✅ All tables created successfully.")
+    # На свежей базе просто отмечает миграции применёнными
+    await run_migrations()
 
 if __name__ == "__main__":
     asyncio.run(init())
\ No newline at end of file
@@ -1,18 +1,9 @@
 # keyboards/inline.py
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from services.i18n import t
+from aiogram.types import InlineKeyboardMarkup
+from keyboards.registry import take_request_keyboard
 
-async def take_request_kb(request_id: int, lang: str) -> InlineKeyboardMarkup:
-    text = await t("take_request_button", lang)
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text=text,
-                    callback_data=f"take:{request_id}"
-                )
-            ]
-        ]
-    )
+
+def take_request_kb(request_id: int, lang: str) -> InlineKeyboardMarkup:
+    return take_request_keyboard(request_id, lang)
 
 
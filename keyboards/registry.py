@@ -0,0 +1,107 @@
+# keyboards/registry.py
+import asyncio
+import time
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from services.i18n import Catalog, get_catalog, on_catalog_change
+from database import crud
+from utils.logger import logger
+from config import LANGUAGE_KEYBOARD_TTL
+
+# Готовые клавиатуры: собираются и проходят валидацию один раз,
+# хендлеры получают уже построенные объекты.
+_main: dict[str, ReplyKeyboardMarkup] = {}
+_close: dict[str, ReplyKeyboardMarkup] = {}
+_take_buttons: dict[str, InlineKeyboardButton] = {}
+
+_language_keyboard: InlineKeyboardMarkup | None = None
+_language_built_at = 0.0
+_language_task: asyncio.Task | None = None
+
+
+def _main_markup(text: str) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(keyboard=[[KeyboardButton(text=text)]], resize_keyboard=True)
+
+
+def _close_markup(text: str) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=text)]],
+        resize_keyboard=True,
+        one_time_keyboard=True
+    )
+
+
+def _take_button(text: str) -> InlineKeyboardButton:
+    # callback_data подменяется на каждый запрос в take_request_keyboard
+    return InlineKeyboardButton(text=text, callback_data="take:0")
+
+
+def _build(catalog: Catalog, key: str, factory):
+    # Пустой текст кнопку не даст: для такого языка остаётся запасная [key]
+    return {lang: factory(text) for lang, text in catalog.texts.get(key, {}).items() if text}
+
+
+@on_catalog_change
+def build_translation_keyboards(catalog: Catalog):
+    """
+    Пересобирает все клавиатуры, зависящие от переводов, и подменяет их разом.
+    """
+    global _main, _close, _take_buttons
+    _main = _build(catalog, "contact_support", _main_markup)
+    _close = _build(catalog, "close_button", _close_markup)
+    _take_buttons = _build(catalog, "take_request_button", _take_button)
+    logger.info(f"⌨️ Keyboards built for v{catalog.version}: {len(_main)} languages")
+
+
+def main_keyboard(lang: str) -> ReplyKeyboardMarkup:
+    return _main.get(lang) or _main_markup("[contact_support]")
+
+
+def close_keyboard(lang: str) -> ReplyKeyboardMarkup:
+    return _close.get(lang) or _close_markup("[close_button]")
+
+
+def take_request_keyboard(request_id: int, lang: str) -> InlineKeyboardMarkup:
+    """
+    Клавиатура «взять запрос» из шаблона языка: меняется только callback_data,
+    модели собираются без повторной валидации.
+    """
+    button = _take_buttons.get(lang) or _take_button("[take_request_button]")
+    return InlineKeyboardMarkup.model_construct(
+        inline_keyboard=[[button.model_copy(update={"callback_data": f"take:{request_id}"})]]
+    )
+
+
+async def build_language_keyboard():
+    global _language_keyboard, _language_built_at
+    langs = await crud.get_available_languages()
+
+    # Преобразуем в список кнопок
+    buttons = [
+        InlineKeyboardButton(
+            text=f"{lang.emoji} {lang.name}",
+            callback_data=f"lang:{lang.code}"
+        ) for lang in langs
+    ]
+
+    # Группируем по 3 в ряд
+    rows = [buttons[i:i + 3] for i in range(0, len(buttons), 3)]
+
+    _language_keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
+    _language_built_at = time.monotonic()
+
+
+async def language_keyboard() -> InlineKeyboardMarkup:
+    global _language_task
+    if _language_keyboard is None:
+        await build_language_keyboard()
+    elif time.monotonic() - _language_built_at > LANGUAGE_KEYBOARD_TTL and (
+        _language_task is None or _language_task.done()
+    ):
+        # Устарела — отдаём текущую, пересобираем в фоне
+        _language_task = asyncio.create_task(build_language_keyboard())
+    return _language_keyboard
+
+
+# Каталог мог загрузиться раньше, чем импортирован этот модуль
+if get_catalog().version:
+    build_translation_keyboards(get_catalog())
@@ -0,0 +1,14 @@
+# migrate.py
+import asyncio
+from database.migrations import run_migrations
+
+
+async def main():
+    applied = await run_migrations()
+    if applied:
+        print("✅ Applied migrations: " + ", ".join(applied))
+    else:
+        print("✅ Database schema is up to date.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,40 @@
+# services/archive.py
+import asyncio
+from datetime import datetime, timedelta
+from database import crud
+from utils.logger import logger
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL
+
+
+async def archive_once(after_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Один проход: переносит в архив все запросы, закрытые больше after_days
+    дней назад, порциями по batch_size (каждая — своя короткая транзакция,
+    чтобы не держать блокировки на горячих таблицах). Возвращает число
+    перенесённых запросов.
+    """
+    closed_before = datetime.utcnow() - timedelta(days=after_days)
+    total = 0
+    while True:
+        moved = await crud.archive_closed_requests(closed_before, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+        # Отдаём цикл событий обработчикам между порциями
+        await asyncio.sleep(0)
+    if total:
+        logger.info(f"📦 Archived {total} requests closed before {closed_before:%Y-%m-%d}")
+    return total
+
+
+async def run_archiver():
+    """
+    Фоновый таск: раз в ARCHIVE_INTERVAL секунд архивирует старые запросы.
+    Запускается через run_as_leader, поэтому работает в одном процессе.
+    """
+    while True:
+        try:
+            await archive_once()
+        except Exception as e:
+            logger.error(f"Ошибка архивации: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL)
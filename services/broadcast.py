@@ -0,0 +1,272 @@
+# services/broadcast.py
+import asyncio
+import time
+from dataclasses import dataclass
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramAPIError, TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup
+from database import crud
+from utils.logger import logger
+from config import (
+    BROADCAST_CONCURRENCY,
+    BROADCAST_RETRIES,
+    GROUP_EDIT_RATE,
+    GROUP_EDIT_BURST,
+    GROUP_EDIT_RETRY_INTERVAL,
+    GROUP_EDIT_RETRY_ROUNDS,
+    SHARD_WORKERS
+)
+
+# Семафор для ограничения одновременных отправок в группы (лимиты Telegram)
+broadcast_semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+
+async def _send_to_group(
+    bot: Bot,
+    chat_id: int,
+    text: str,
+    photo_file_id: str | None,
+    reply_markup: InlineKeyboardMarkup | None,
+) -> int | None:
+    """
+    Отправляет сообщение в одну группу. Возвращает message_id или None при ошибке.
+    Во время ожидания retry_after слот семафора не удерживается.
+    """
+    for attempt in range(1, BROADCAST_RETRIES + 1):
+        try:
+            async with broadcast_semaphore:
+                if photo_file_id:
+                    msg = await bot.send_photo(
+                        chat_id,
+                        photo=photo_file_id,
+                        caption=text,
+                        reply_markup=reply_markup
+                    )
+                else:
+                    msg = await bot.send_message(
+                        chat_id,
+                        text,
+                        reply_markup=reply_markup
+                    )
+                return msg.message_id
+        except TelegramRetryAfter as e:
+            if attempt == BROADCAST_RETRIES:
+                logger.warning(f"⚠ Флуд-лимит в чате {chat_id}, попытки исчерпаны: {e}")
+                return None
+            await asyncio.sleep(e.retry_after)
+        except TelegramAPIError as e:
+            logger.warning(f"⚠ Не удалось отправить запрос в чат {chat_id}: {e}")
+            return None
+    return None
+
+
+async def broadcast_request(
+    bot: Bot,
+    request_id: int,
+    texts: dict[int, str],
+    photo_file_id: str | None = None,
+    reply_markup: InlineKeyboardMarkup | None = None,
+) -> list[int]:
+    """
+    Рассылает запрос во все группы одновременно и сохраняет
+    SupportRequestMessage одним INSERT.
+
+    texts — {group_id: текст для этой группы}.
+    Возвращает список групп, куда сообщение доставлено.
+    """
+    chat_ids = list(texts)
+    message_ids = await asyncio.gather(*(
+        _send_to_group(bot, chat_id, texts[chat_id], photo_file_id, reply_markup)
+        for chat_id in chat_ids
+    ))
+
+    rows = [
+        {
+            "request_id": request_id,
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "text": None if photo_file_id else texts[chat_id],
+            "caption": texts[chat_id] if photo_file_id else None,
+            "photo_file_id": photo_file_id,
+        }
+        for chat_id, message_id in zip(chat_ids, message_ids)
+        if message_id is not None
+    ]
+    # Пишем сразу, а не через очередь: «взять» может нажать модератор,
+    # чей апдейт обрабатывает другой процесс, и список анонсов ему нужен полностью
+    try:
+        await crud.save_request_messages(rows)
+    except Exception as e:
+        logger.error(f"Request {request_id}: анонсы не сохранены: {e}")
+
+    failed = len(chat_ids) - len(rows)
+    if failed:
+        logger.warning(f"Request {request_id}: не доставлено в {failed} из {len(chat_ids)} групп")
+    return [row["chat_id"] for row in rows]
+
+
+# ======= Редактирование анонсов в группах =======
+
+class TokenBucket:
+    """
+    Простой токен-бакет: rate токенов в секунду, не больше capacity.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class AnnouncementEdit:
+    chat_id: int
+    message_id: int
+    text: str
+    is_photo: bool = False
+
+
+_chat_buckets: dict[int, TokenBucket] = {}
+
+# Ожидающие правки: (chat_id, message_id) -> последняя версия текста
+_pending_edits: dict[tuple[int, int], AnnouncementEdit] = {}
+
+# Неудавшиеся правки для повторной попытки
+failed_edits: dict[tuple[int, int], AnnouncementEdit] = {}
+# Сколько раз правку уже повторяли
+_retry_rounds: dict[tuple[int, int], int] = {}
+
+# Держим ссылки на фоновые задачи, чтобы их не собрал GC
+_background_tasks: set[asyncio.Task] = set()
+
+
+# Бакеты у каждого процесса свои: при SHARD_WORKERS воркеров правки в один
+# чат могут идти из любого, поэтому каждый получает свою долю лимита
+_EDIT_SHARE = max(SHARD_WORKERS, 1)
+
+
+def _bucket(chat_id: int) -> TokenBucket:
+    bucket = _chat_buckets.get(chat_id)
+    if bucket is None:
+        bucket = _chat_buckets[chat_id] = TokenBucket(
+            GROUP_EDIT_RATE / _EDIT_SHARE,
+            max(GROUP_EDIT_BURST // _EDIT_SHARE, 1)
+        )
+    return bucket
+
+
+async def _apply_edit(bot: Bot, key: tuple[int, int]):
+    await _bucket(key[0]).acquire()
+
+    # Берём самую свежую версию правки; дубликаты к этому моменту уже слиты
+    edit = _pending_edits.pop(key, None)
+    if edit is None:
+        return
+
+    for attempt in range(1, BROADCAST_RETRIES + 1):
+        try:
+            if edit.is_photo:
+                await bot.edit_message_caption(
+                    chat_id=edit.chat_id,
+                    message_id=edit.message_id,
+                    caption=edit.text,
+                    reply_markup=None
+                )
+            else:
+                await bot.edit_message_text(
+                    chat_id=edit.chat_id,
+                    message_id=edit.message_id,
+                    text=edit.text,
+                    reply_markup=None
+                )
+            failed_edits.pop(key, None)
+            return
+        except TelegramRetryAfter as e:
+            if attempt == BROADCAST_RETRIES:
+                break
+            await asyncio.sleep(e.retry_after)
+        except TelegramBadRequest as e:
+            if "message is not modified" in str(e):
+                failed_edits.pop(key, None)
+                return
+            logger.warning(f"⚠ Не удалось обновить сообщение в чате {edit.chat_id}: {e}")
+            break
+        except TelegramAPIError as e:
+            logger.warning(f"⚠ Не удалось обновить сообщение в чате {edit.chat_id}: {e}")
+            break
+
+    failed_edits[key] = edit
+
+
+async def _run_edits(bot: Bot, keys: list[tuple[int, int]]):
+    try:
+        await asyncio.gather(*(_apply_edit(bot, key) for key in keys))
+    except Exception as e:
+        logger.exception(f"❌ Ошибка фонового обновления анонсов: {e}")
+
+
+def schedule_edits(bot: Bot, edits: list[AnnouncementEdit]) -> asyncio.Task | None:
+    """
+    Ставит правки анонсов в фон. Повторная правка того же сообщения,
+    пока предыдущая ещё ждёт очереди, просто заменяет её текст.
+    """
+    new_keys = []
+    for edit in edits:
+        key = (edit.chat_id, edit.message_id)
+        if key not in _pending_edits:
+            new_keys.append(key)
+        _pending_edits[key] = edit
+
+    if not new_keys:
+        return None
+
+    task = asyncio.create_task(_run_edits(bot, new_keys))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def retry_failed_edits(bot: Bot) -> asyncio.Task | None:
+    """
+    Повторяет все неудавшиеся правки. Правка, не прошедшая за
+    GROUP_EDIT_RETRY_ROUNDS повторов (сообщение удалено и т.п.), забывается.
+    """
+    rounds = {}
+    edits = []
+    for key, edit in failed_edits.items():
+        rounds[key] = _retry_rounds.get(key, 0) + 1
+        if rounds[key] > GROUP_EDIT_RETRY_ROUNDS:
+            logger.warning(f"⚠ Правка сообщения {key[1]} в чате {key[0]} отброшена после {GROUP_EDIT_RETRY_ROUNDS} повторов")
+            del rounds[key]
+            continue
+        edits.append(edit)
+    failed_edits.clear()
+    # Счётчики прошедших правок не нужны
+    _retry_rounds.clear()
+    _retry_rounds.update(rounds)
+    return schedule_edits(bot, edits)
+
+
+async def watch_failed_edits(bot: Bot):
+    """
+    Фоновый таск: раз в GROUP_EDIT_RETRY_INTERVAL секунд повторяет
+    неудавшиеся правки анонсов.
+    """
+    if GROUP_EDIT_RETRY_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(GROUP_EDIT_RETRY_INTERVAL)
+        if failed_edits:
+            retry_failed_edits(bot)
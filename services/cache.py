@@ -1,8 +1,7 @@
 from aiocache import cached, Cache, caches
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from services.i18n import t
-from database import crud
+from services.i18n import t, catalog_version
+from database import crud, events
+from services.shared_cache import shared_cache, shared_cached
 
 # Глобальная настройка кеша
 caches.set_config({
@@ -12,74 +11,61 @@ caches.set_config({
     }
 })
 
-@cached(ttl=60, cache=Cache.MEMORY) 
+
+def _versioned_key(func, *args, **kwargs):
+    """
+    Ключ производных от переводов кешей включает версию каталога:
+    после перезагрузки переводов старые записи больше не читаются.
+    """
+    return ":".join([func.__name__, str(catalog_version()), *map(str, args), *map(str, kwargs.values())])
+
+
+# Данные из БД — в общем кеше (см. CACHE_BACKEND). Записи, которые
+# сбрасываются событиями из crud, живут долго. Роль пользователя меняют
+# и из админки мимо бота, поэтому пользователь кешируется ненадолго
+@shared_cached("user", ttl=60)
 async def get_user_cached(user_id: int):
     return await crud.get_user(user_id)
 
-@cached(ttl=60, cache=Cache.MEMORY)
+@shared_cached("active_request_user", ttl=600)
 async def get_active_request_by_user_cached(user_id: int):
     return await crud.get_active_request_by_user(user_id)
 
-@cached(ttl=10, cache=Cache.MEMORY)
+@shared_cached("active_request_mod", ttl=600)
 async def get_active_request_by_moderator_cached(mod_id: int):
     return await crud.get_active_request_by_moderator(mod_id)
 
-@cached(ttl=30, cache=Cache.MEMORY)
+@shared_cached("initial_message", ttl=3600)
 async def get_initial_message_cached(request_id: int):
     return await crud.get_initial_message(request_id)
 
-@cached(ttl=30, cache=Cache.MEMORY)
+@shared_cached("request", ttl=600)
 async def get_request_by_id_cached(request_id: int):
     return await crud.get_request_by_id(request_id)
 
-@cached(ttl=300, cache=Cache.MEMORY)
-async def get_language_keyboard() -> InlineKeyboardMarkup:
-    langs = await crud.get_available_languages()
-
-    # Преобразуем в список кнопок
-    buttons = [
-        InlineKeyboardButton(
-            text=f"{lang.emoji} {lang.name}",
-            callback_data=f"lang:{lang.code}"
-        ) for lang in langs
-    ]
-
-    # Группируем по 3 в ряд
-    rows = [buttons[i:i + 3] for i in range(0, len(buttons), 3)]
-
-    return InlineKeyboardMarkup(inline_keyboard=rows)
-
-@cached(ttl=300, cache=Cache.MEMORY)
+@shared_cached("language_names", ttl=300)
 async def get_language_name_cached() -> list[dict[str, str]]:
     langs = await crud.get_available_languages()
     return [{"code": lang.code, "name_ru": lang.name_ru} for lang in langs]
 
 
-@cached(ttl=300, cache=Cache.MEMORY)
+@shared_cached("language_codes_ru", ttl=300)
 async def get_language_codes_with_russian_names_cached() -> list[dict[str, str]]:
     return await crud.get_language_codes_with_russian_names()
 
-@cached(ttl=60, cache=Cache.MEMORY)
-async def get_main_keyboard(lang: str) -> ReplyKeyboardMarkup:
-    builder = ReplyKeyboardBuilder()
-    btn = KeyboardButton(text=await t("contact_support", lang))
-    builder.add(btn)
-    builder.adjust(1)
-    return builder.as_markup(resize_keyboard=True)
-
-@cached(ttl=300, cache=Cache.MEMORY)
+@cached(ttl=300, cache=Cache.MEMORY, key_builder=_versioned_key)
 async def t_cached(key: str, lang: str):
     return await t(key, lang)
 
-@cached(ttl=300, cache=Cache.MEMORY)
+@cached(ttl=300, cache=Cache.MEMORY, key_builder=_versioned_key)
 async def get_close_text(lang: str):
     return await t("close_button", lang)
 
-@cached(ttl=300, cache=Cache.MEMORY)
+@shared_cached("support_group", ttl=3600)
 async def get_support_group_cached(group_id: int):
     return await crud.get_support_group(group_id)
 
-@cached(ttl=300, cache=Cache.MEMORY)
+@shared_cached("allowed_group_ids", ttl=3600)
 async def get_allowed_group_ids_cached() -> set[int]:
     groups = await crud.get_all_groups_with_languages()
     
@@ -89,6 +75,28 @@ async def get_allowed_group_ids_cached() -> set[int]:
 
     return {group["group_id"] for group in groups}
 
-@cached(ttl=300, cache=Cache.MEMORY)
+@shared_cached("groups_with_languages", ttl=3600)
 async def get_all_groups_with_languages_cached() -> list[dict]:
-    return await crud.get_all_groups_with_languages()
\ No newline at end of file
+    return await crud.get_all_groups_with_languages()
+
+
+# ======= Инвалидация по событиям из crud =======
+# Ключи сбрасываются в общем кеше и рассылаются остальным процессам
+
+@events.on("user_changed")
+async def _invalidate_user(user_id: int):
+    await shared_cache.invalidate(f"user:{user_id}")
+
+@events.on("request_changed")
+async def _invalidate_request(request_id: int, user_id: int, moderator_id: int | None):
+    keys = [f"request:{request_id}", f"active_request_user:{user_id}"]
+    if moderator_id:
+        keys.append(f"active_request_mod:{moderator_id}")
+    await shared_cache.invalidate(*keys)
+
+@events.on("groups_changed")
+async def _invalidate_groups(group_id: int | None):
+    keys = ["allowed_group_ids", "groups_with_languages"]
+    if group_id is not None:
+        keys.append(f"support_group:{group_id}")
+    await shared_cache.invalidate(*keys)
\ No newline at end of file
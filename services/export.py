@@ -0,0 +1,104 @@
+# services/export.py
+import csv
+import json
+from dataclasses import asdict
+from datetime import datetime
+from typing import TextIO
+from database import crud
+from database.snapshots import RequestSnapshot, MessageSnapshot
+
+CSV_FIELDS = [
+    "request_id", "user_id", "assigned_moderator_id", "status", "language",
+    "created_at", "taken_at", "closed_at",
+    "message_id", "sender_id", "text", "caption", "photo_file_id",
+]
+
+
+def _plain(snapshot) -> dict:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in asdict(snapshot).items()
+    }
+
+
+async def iter_transcripts(since: datetime | None = None, until: datetime | None = None):
+    """
+    Пары (запрос, его сообщения): сначала архив, затем горячие таблицы,
+    внутри каждого — по возрастанию id запроса.
+    """
+    for archived in (True, False):
+        async for item in _iter_source(since, until, archived):
+            yield item
+
+
+async def _iter_source(since: datetime | None, until: datetime | None, archived: bool):
+    # Запросы и сообщения читаются двумя серверными курсорами и сливаются
+    # по request_id, так что в памяти только переписка текущего запроса.
+    lo, hi = await crud.get_request_id_range(since, until, archived)
+    if lo is None:
+        return
+
+    messages = crud.stream_messages(lo, hi, archived)
+    requests = crud.stream_requests(since, until, archived)
+    try:
+        pending = await anext(messages, None)
+
+        async for req in requests:
+            while pending and pending.request_id < req.id:
+                pending = await anext(messages, None)
+
+            transcript: list[MessageSnapshot] = []
+            while pending and pending.request_id == req.id:
+                transcript.append(pending)
+                pending = await anext(messages, None)
+
+            yield req, transcript
+    finally:
+        # Серверные курсоры (и их соединения) закрываем сразу, а не при сборке мусора:
+        # сообщения обычно дочитаны не до конца, а потребитель мог остановиться раньше
+        await requests.aclose()
+        await messages.aclose()
+
+
+def _write_jsonl(out: TextIO, req: RequestSnapshot, transcript: list[MessageSnapshot]):
+    line = {**_plain(req), "messages": [_plain(message) for message in transcript]}
+    out.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def _write_csv(writer: csv.DictWriter, req: RequestSnapshot, transcript: list[MessageSnapshot]):
+    base = _plain(req)
+    base["request_id"] = base.pop("id")
+    if not transcript:
+        writer.writerow(base)
+    for message in transcript:
+        row = _plain(message)
+        row["message_id"] = row.pop("id")
+        row.pop("request_id")
+        writer.writerow({**base, **row})
+
+
+async def export_transcripts(
+    out: TextIO,
+    fmt: str = "jsonl",
+    since: datetime | None = None,
+    until: datetime | None = None
+) -> int:
+    """
+    Выгружает запросы с перепиской в out: jsonl — строка на запрос,
+    csv — строка на сообщение. Возвращает число выгруженных запросов.
+    """
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    elif fmt != "jsonl":
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+    count = 0
+    async for req, transcript in iter_transcripts(since, until):
+        if writer:
+            _write_csv(writer, req, transcript)
+        else:
+            _write_jsonl(out, req, transcript)
+        count += 1
+    return count
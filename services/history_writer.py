@@ -0,0 +1,242 @@
+# services/history_writer.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+from database import crud
+from utils.logger import logger
+from config import HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_QUEUE_SIZE, HISTORY_DRAIN_TIMEOUT
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенной записи: строки копятся и уходят в БД одним INSERT,
+    когда набралось batch_size штук или прошло flush_interval секунд.
+    Переполненная очередь тормозит put (backpressure), stop() дописывает всё.
+
+    По каждому запросу считаются поставленные и обработанные строки:
+    wait_flushed(request_id) ждёт только строки этого запроса, а не
+    опустошения всей очереди.
+    """
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list[dict]], Awaitable[None]],
+        batch_size: int,
+        flush_interval: float,
+        max_size: int,
+        retries: int = 3
+    ):
+        self.name = name
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        # None — сигнал остановки
+        self._queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=max_size)
+        self._task: asyncio.Task | None = None
+        # request_id -> [поставлено, обработано]; удаляется, когда сравнялись
+        self._pending: dict[int, list[int]] = {}
+        self._progress: asyncio.Condition | None = None
+        # Задачи уведомления держим, пока не отработают (иначе их соберёт GC)
+        self._notifiers: set[asyncio.Task] = set()
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    async def put(self, row: dict):
+        if self._task is None:
+            self.start()
+        counters = self._pending.setdefault(row.get("request_id"), [0, 0])
+        counters[0] += 1
+        await self._queue.put(row)
+
+    def start(self):
+        if self._task is None:
+            self._progress = asyncio.Condition()
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._on_stopped)
+
+    def _on_stopped(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"❌ {self.name}: фоновая запись упала: {task.exception()}")
+        # Будим wait_flushed: писать больше некому
+        notifier = asyncio.create_task(self._notify())
+        self._notifiers.add(notifier)
+        notifier.add_done_callback(self._notifiers.discard)
+
+    async def _notify(self):
+        if self._progress:
+            async with self._progress:
+                self._progress.notify_all()
+
+    async def _flush_timed(self, rows: list[dict]):
+        start = time.perf_counter()
+        await self._flush(rows)
+        latency = time.perf_counter() - start
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+
+    async def _write(self, rows: list[dict]):
+        for attempt in range(1, self.retries + 1):
+            try:
+                await self._flush_timed(rows)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"❌ {self.name}: пачка из {len(rows)} строк не записалась: {e}")
+                    break
+                await asyncio.sleep(0.5 * attempt)
+
+        # Одна битая строка не должна уносить пачку чужих сообщений:
+        # пишем по одной и теряем только те, что не проходят сами по себе
+        if len(rows) == 1:
+            self.dropped_rows += 1
+            return
+        for row in rows:
+            try:
+                await self._flush_timed([row])
+            except Exception as e:
+                self.dropped_rows += 1
+                logger.error(f"❌ {self.name}: строка не записана ({row.get('request_id')}): {e}")
+
+    async def _next_batch(self) -> tuple[list[dict], bool]:
+        """
+        Пачка строк и признак того, что встретился сигнал остановки.
+        """
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _process(self, batch: list[dict]):
+        # Потерянные строки тоже считаются обработанными: ждать их бессмысленно
+        await self._write(batch)
+        for row in batch:
+            request_id = row.get("request_id")
+            counters = self._pending.get(request_id)
+            if counters:
+                counters[1] += 1
+                if counters[1] >= counters[0]:
+                    del self._pending[request_id]
+        await self._notify()
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._process(batch)
+            if stopping:
+                return
+
+    async def wait_flushed(self, request_id: int, timeout: float = HISTORY_DRAIN_TIMEOUT) -> bool:
+        """
+        Ждёт (не дольше timeout), пока строки request_id, поставленные до
+        вызова, будут записаны. False — не дождались или запись остановилась.
+        """
+        counters = self._pending.get(request_id)
+        if counters is None or self._progress is None:
+            return True
+        # Строки, поставленные позже, не ждём
+        target = counters[0]
+
+        def written() -> bool:
+            current = self._pending.get(request_id)
+            return current is None or current is not counters or counters[1] >= target
+
+        def ready() -> bool:
+            return written() or self._task is None or self._task.done()
+
+        try:
+            async with self._progress:
+                await asyncio.wait_for(self._progress.wait_for(ready), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠ {self.name}: строки запроса {request_id} не записаны за {timeout} с")
+            return False
+        return written()
+
+    async def stop(self):
+        """
+        Останавливает фоновую запись: текущая пачка и всё, что стоит
+        в очереди до сигнала остановки, дописываются.
+        """
+        if self._task and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+
+        # Запись упала или строки пришли после сигнала — дописываем сами
+        rest = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                rest.append(item)
+        for i in range(0, len(rest), self.batch_size):
+            await self._process(rest[i:i + self.batch_size])
+        if rest:
+            logger.info(f"{self.name}: при остановке дописано {len(rest)} строк")
+
+    def stats(self) -> dict:
+        return {
+            "depth": self._queue.qsize(),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "dropped_rows": self.dropped_rows,
+            "last_flush_ms": round(self.last_flush_latency * 1000, 2),
+            "max_flush_ms": round(self.max_flush_latency * 1000, 2),
+            "alive": bool(self._task and not self._task.done()),
+        }
+
+
+message_history_queue = WriteBehindQueue(
+    "message_history",
+    crud.save_messages,
+    HISTORY_BATCH_SIZE,
+    HISTORY_FLUSH_INTERVAL,
+    HISTORY_QUEUE_SIZE
+)
+
+
+async def save_message(
+    request_id: int,
+    sender_id: int,
+    text: str | None = None,
+    caption: str | None = None,
+    photo_file_id: str | None = None
+):
+    await message_history_queue.put({
+        "request_id": request_id,
+        "sender_id": sender_id,
+        "text": text,
+        "caption": caption,
+        "photo_file_id": photo_file_id,
+        # Время фиксируем сейчас, а не в момент записи пачки
+        "timestamp": datetime.utcnow(),
+    })
+
+
+async def stop():
+    await message_history_queue.stop()
+
+
+def get_stats() -> dict:
+    return {
+        "message_history": message_history_queue.stats(),
+    }
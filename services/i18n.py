@@ -1,31 +1,214 @@
 # services/i18n.py
-from sqlalchemy import select
+import asyncio
+import time
+from dataclasses import dataclass, field
+from html import escape
+from string import Formatter
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import select, func
 from database.base import async_session
 from database.models import Translation
+from services.shared_cache import shared_cache
+from config import TRANSLATIONS_POLL_INTERVAL, TRANSLATIONS_FULL_RELOAD_INTERVAL
 import logging
 
 logger = logging.getLogger(__name__)  # наверху файла
 
-_translation_cache = {}
 
-support_triggers: list[str] = []
+class Template:
+    """
+    Перевод, скомпилированный при загрузке: escape-последовательности
+    раскрыты, плейсхолдеры {name} разобраны. Подставляемые значения
+    экранируются для HTML.
+    """
+    __slots__ = ("text", "parts")
+
+    def __init__(self, raw: str):
+        self.text = raw.replace("\\n", "\n")
+        try:
+            parsed = list(Formatter().parse(self.text))
+        except ValueError:
+            # Непарные фигурные скобки — считаем текст статичным
+            parsed = [(self.text, None, None, None)]
+
+        parts: list[tuple[bool, str]] = []
+        for literal, name, _, _ in parsed:
+            if literal:
+                parts.append((False, literal))
+            if name is not None:
+                parts.append((True, name))
+        # None — без плейсхолдеров, render отдаёт готовую строку
+        self.parts = tuple(parts) if any(is_field for is_field, _ in parts) else None
+
+    def render(self, values: dict) -> str:
+        if self.parts is None:
+            return self.text
+        return "".join(
+            (escape(str(values[chunk])) if chunk in values else f"{{{chunk}}}") if is_field else chunk
+            for is_field, chunk in self.parts
+        )
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """
+    Неизменяемый снимок переводов. При перезагрузке собирается новый
+    каталог со следующей версией и подменяется целиком.
+    """
+    version: int = 0
+    texts: dict[str, dict[str, str]] = field(default_factory=dict)
+    support_triggers: frozenset[str] = frozenset()
+    updated_at: datetime | None = None
+    templates: dict[str, dict[str, Template]] = field(default_factory=dict)
+
+
+_catalog = Catalog()
+
+# Насколько раньше отметки прошлой загрузки начинать следующую дельту
+DELTA_OVERLAP = timedelta(seconds=10)
+
+# Обработчики смены версии: сброс производных кешей (клавиатуры и т.п.)
+_version_listeners: list[Callable[[Catalog], None]] = []
+
+
+def get_catalog() -> Catalog:
+    return _catalog
+
+
+def catalog_version() -> int:
+    return _catalog.version
+
+
+def on_catalog_change(listener: Callable[[Catalog], None]):
+    _version_listeners.append(listener)
+    return listener
+
+
+def is_support_trigger(text: str | None) -> bool:
+    # Фильтр читает актуальный каталог при каждом вызове
+    return text in _catalog.support_triggers
+
+
+async def load_translations(full: bool = True) -> bool:
+    """
+    full=True — перечитать всю таблицу, иначе только строки с updated_at
+    не раньше последней загрузки. Возвращает True, если версия сменилась.
+    """
+    global _catalog
+    current = _catalog
+    delta = not full and current.updated_at is not None
 
-async def load_translations():
-    global _translation_cache, support_triggers
     async with async_session() as session:
-        result = await session.execute(select(Translation))
-        _translation_cache = {}
-        support_triggers = []
+        # updated_at ставит сама БД (в том числе при правках из админки),
+        # поэтому и отметку берём по часам БД, а не по своим
+        db_now = (await session.execute(select(func.now()))).scalar()
+        query = select(Translation.key, Translation.lang, Translation.text)
+        if delta:
+            query = query.where(Translation.updated_at >= current.updated_at)
+        result = await session.execute(query)
+        rows = result.all()
+
+    # translations.text допускает NULL: такая строка — как отсутствующий
+    # перевод, t() и render отдают [key]
+    if delta:
+        texts = dict(current.texts)
+        changed = False
+        for key, lang, text in rows:
+            if text is None:
+                if lang in texts.get(key, {}):
+                    texts[key] = {other: value for other, value in texts[key].items() if other != lang}
+                    changed = True
+                continue
+            if texts.get(key, {}).get(lang) != text:
+                texts[key] = {**texts.get(key, {}), lang: text}
+                changed = True
+    else:
+        texts = {}
+        for key, lang, text in rows:
+            if text is not None:
+                texts.setdefault(key, {})[lang] = text
+        changed = texts != current.texts or current.version == 0
+
+    # С перекрытием: транзакция, закоммиченная позже, чем мы прочитали,
+    # может нести более раннюю отметку — такие строки перечитаются
+    updated_at = db_now - DELTA_OVERLAP
+
+    if not changed:
+        if updated_at != current.updated_at:
+            _catalog = Catalog(current.version, current.texts, current.support_triggers, updated_at, current.templates)
+        return False
+
+    # Шаблоны компилируются один раз; неизменившиеся берём из прошлой версии
+    templates = {}
+    for key, by_lang in texts.items():
+        old = current.templates.get(key, {})
+        templates[key] = {
+            lang: old[lang] if lang in old and current.texts[key][lang] == text else Template(text)
+            for lang, text in by_lang.items()
+        }
+
+    _catalog = Catalog(
+        version=current.version + 1,
+        texts=texts,
+        support_triggers=frozenset(texts.get("contact_support", {}).values()),
+        updated_at=updated_at,
+        templates=templates
+    )
+    logger.info(f"📋 Translations v{_catalog.version}, support_triggers = {sorted(_catalog.support_triggers)}")
 
-        for row in result.scalars():
-            _translation_cache.setdefault(row.key, {})[row.lang] = row.text
-            if row.key == "contact_support":
-                support_triggers.append(row.text)
+    for listener in _version_listeners:
+        try:
+            listener(_catalog)
+        except Exception as e:
+            logger.error(f"Error in catalog listener {listener.__name__}: {e}")
+    return True
 
-        logger.info(f"📋 support_triggers = {support_triggers}")
 
 async def t(key: str, lang: str) -> str:
-    if not _translation_cache:
+    if not _catalog.version:
         await load_translations()
 
-    return _translation_cache.get(key, {}).get(lang) or f"[{key}]"
\ No newline at end of file
+    return _catalog.texts.get(key, {}).get(lang) or f"[{key}]"
+
+
+def render(key: str, lang: str, **values) -> str:
+    """
+    Готовый текст перевода с подставленными (и экранированными) значениями.
+    """
+    template = _catalog.templates.get(key, {}).get(lang)
+    if template is None:
+        return f"[{key}]"
+    return template.render(values)
+
+
+@shared_cache.on("translations_reload")
+async def _on_translations_reload():
+    # /reload_translations выполнили в другом процессе
+    await load_translations()
+    logger.info("📋 Translations reloaded by another worker")
+
+
+async def reload_translations_everywhere():
+    await load_translations()
+    await shared_cache.broadcast("translations_reload")
+
+
+async def watch_translations():
+    """
+    Фоновая дозагрузка строк, изменённых в админке, по updated_at.
+    Удалённые строки по updated_at не видны, поэтому раз в
+    TRANSLATIONS_FULL_RELOAD_INTERVAL секунд таблица перечитывается целиком.
+    """
+    if TRANSLATIONS_POLL_INTERVAL <= 0:
+        return
+    last_full = time.monotonic()
+    while True:
+        await asyncio.sleep(TRANSLATIONS_POLL_INTERVAL)
+        full = time.monotonic() - last_full >= TRANSLATIONS_FULL_RELOAD_INTERVAL
+        try:
+            await load_translations(full=full)
+            if full:
+                last_full = time.monotonic()
+        except Exception as e:
+            logger.error(f"Ошибка дозагрузки переводов: {e}")
@@ -0,0 +1,68 @@
+# services/leader.py
+import asyncio
+from typing import Awaitable, Callable
+from sqlalchemy import text
+from database.base import engine
+from utils.logger import logger
+from config import LEADER_RETRY_INTERVAL, LEADER_HEARTBEAT_INTERVAL
+
+
+async def _still_leader(conn, name: str) -> bool:
+    result = await conn.execute(
+        text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"),
+        {"name": name}
+    )
+    held = result.scalar()
+    await conn.commit()
+    return bool(held)
+
+
+async def run_as_leader(name: str, job: Callable[[], Awaitable[None]]):
+    """
+    Запускает job только в одном процессе из всех, подключённых к БД.
+
+    Лидерство — именованная блокировка MySQL GET_LOCK на выделенном
+    соединении: если процесс-лидер падает, соединение рвётся и блокировку
+    через LEADER_RETRY_INTERVAL секунд подхватывает другой процесс.
+    """
+    while True:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name})
+                acquired = result.scalar() == 1
+                await conn.commit()
+
+                if acquired:
+                    await _lead(conn, name, job)
+        except Exception as e:
+            logger.error(f"Ошибка лидерства '{name}': {e}")
+
+        await asyncio.sleep(LEADER_RETRY_INTERVAL)
+
+
+async def _lead(conn, name: str, job: Callable[[], Awaitable[None]]):
+    logger.info(f"👑 Лидерство '{name}' получено, запускаю задачу")
+    job_task = asyncio.create_task(job())
+    try:
+        while not job_task.done():
+            await asyncio.sleep(LEADER_HEARTBEAT_INTERVAL)
+            if not await _still_leader(conn, name):
+                logger.warning(f"⚠ Лидерство '{name}' потеряно")
+                break
+
+        if job_task.done() and not job_task.cancelled() and job_task.exception():
+            logger.error(f"❌ Задача '{name}' упала: {job_task.exception()}")
+    finally:
+        released = False
+        try:
+            # Дожидаемся остановки задачи, прежде чем отдать блокировку
+            job_task.cancel()
+            await asyncio.gather(job_task, return_exceptions=True)
+            await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+            await conn.commit()
+            released = True
+        finally:
+            if not released:
+                # Откат при возврате в пул GET_LOCK не снимает: соединение
+                # закрываем, и блокировка уходит вместе с сессией MySQL
+                await conn.invalidate()
@@ -1,44 +1,221 @@
-import os
-import json
-import asyncio
-from openai import AsyncOpenAI
-from openai import OpenAIError, RateLimitError, APIError, Timeout
+import time
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 from dotenv import load_dotenv
+from services import translation_cache
+from services.translation_batcher import TranslationBatcher
+from services.translators import Translator, create_translator
+from services.resilience import CircuitBreaker
+from utils.logger import logger
+from config import (
+    TRANSLATOR_BACKEND,
+    TRANSLATION_STREAM_EDIT_INTERVAL,
+    TRANSLATION_BREAKER_FAILURES,
+    TRANSLATION_BREAKER_RESET,
+    TRANSLATION_UNAVAILABLE_MARKER,
+    TRANSLATION_BATCH_WINDOW_MS,
+    TRANSLATION_BATCH_MAX_ITEMS,
+    TRANSLATION_BATCH_MAX_TOKENS
+)
 
 load_dotenv()
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-    raise RuntimeError("❌ Переменная OPENAI_API_KEY не найдена в окружении")
+# Бэкенд создаётся при первом переводе, а не при импорте
+_translator: Translator | None = None
 
-client = AsyncOpenAI(api_key=openai_api_key)
 
-# Семафор для ограничения одновременных переводов
-openai_semaphore = asyncio.Semaphore(5)
+def get_translator() -> Translator:
+    global _translator
+    if _translator is None:
+        _translator = create_translator(TRANSLATOR_BACKEND)
+    return _translator
 
-async def translate_with_gpt(text: str, lang_name: str, retries: int = 3, delay: float = 2.0) -> str:
-    system_msg = (
-        f"Ты — профессиональный переводчик и носитель языка ({lang_name}).\n"
-        f"Твоя задача — перевести сообщение для службы поддержки на {lang_name}.\n\n"
-        f"Переводи так, как сказал бы реальный человек. Разрешён лёгкий неформальный стиль, если он уместен.\n\n"
-        f"Важно:\n"
-        f"- Не добавляй ничего лишнего. Ответ — только перевод оригинального текста."
-    )
 
-    async with openai_semaphore:  # 👈 здесь лимит concurrency
-        for attempt in range(1, retries + 1):
+def set_translator(translator: Translator):
+    global _translator
+    _translator = translator
+
+
+async def _translate_batch(lang_name: str, texts: list[str]) -> list[str | None]:
+    # Один вызов провайдера — одна отметка предохранителя, сколько бы
+    # текстов ни было в пакете
+    try:
+        results = await get_translator().translate_batch(texts, lang_name)
+    except Exception:
+        breaker.record_failure()
+        raise
+    if any(result is not None for result in results):
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+    return results
+
+
+breaker = CircuitBreaker(
+    "translator",
+    failure_threshold=TRANSLATION_BREAKER_FAILURES,
+    reset_timeout=TRANSLATION_BREAKER_RESET
+)
+
+batcher = TranslationBatcher(
+    _translate_batch,
+    window=TRANSLATION_BATCH_WINDOW_MS / 1000,
+    max_items=TRANSLATION_BATCH_MAX_ITEMS,
+    max_tokens=TRANSLATION_BATCH_MAX_TOKENS
+)
+
+
+def _untranslated(text: str) -> str:
+    return f"{text}\n\n{TRANSLATION_UNAVAILABLE_MARKER}"
+
+
+def get_translation_health() -> dict:
+    """
+    Состояние перевода для мониторинга: предохранитель, лимит, кеш.
+    """
+    try:
+        translator = get_translator()
+    except Exception as e:
+        # Например, нет OPENAI_API_KEY — статус всё равно нужен
+        translator = None
+        backend = f"{TRANSLATOR_BACKEND} (недоступен: {e})"
+    else:
+        backend = translator.name
+    limiter = getattr(translator, "limiter", None)
+    return {
+        "backend": backend,
+        "breaker": breaker.metrics(),
+        "limiter": limiter.metrics() if limiter else None,
+        "cache": translation_cache.get_stats(),
+    }
+
+
+async def translate_with_gpt(text: str, lang_name: str) -> str:
+    if not text.strip():
+        return text
+
+    model = get_translator().name
+    cached = await translation_cache.get(text, lang_name, model)
+    if cached is not None:
+        return cached
+
+    # Переводчик деградировал — сразу отдаём оригинал с пометкой
+    permit = breaker.admit()
+    if permit is None:
+        return _untranslated(text)
+
+    # Успех/неудачу отмечает _translate_batch; release — если до него не дошло
+    try:
+        translated = await batcher.submit(text, lang_name)
+    finally:
+        breaker.release(permit)
+    if translated is None:
+        return text
+
+    await translation_cache.put(text, lang_name, model, translated)
+    return translated
+
+
+async def _edit_stream_message(bot: Bot, chat_id: int, message_id: int, text: str, final: bool = False):
+    """
+    Промежуточные куски — простым текстом: обрезанный посреди тега или
+    сущности HTML Telegram не примет. Итог — с parse_mode по умолчанию,
+    как обычный перевод; если он не разбирается как HTML — простым текстом.
+    """
+    try:
+        if final:
+            try:
+                await bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text)
+                return
+            except TelegramBadRequest as e:
+                if "message is not modified" in str(e):
+                    return
+        await bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text, parse_mode=None)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            logger.warning(f"⚠ Не удалось обновить перевод в чате {chat_id}: {e}")
+    except TelegramAPIError as e:
+        logger.warning(f"⚠ Не удалось обновить перевод в чате {chat_id}: {e}")
+
+
+async def translate_streaming(bot: Bot, chat_id: int, text: str, lang_name: str) -> str:
+    """
+    Переводит text и сразу показывает его в chat_id: первый кусок уходит
+    отдельным сообщением, дальше оно дописывается через edit_message_text
+    не чаще раза в TRANSLATION_STREAM_EDIT_INTERVAL секунд.
+    Возвращает итоговый перевод (или оригинал, если перевод не удался).
+    """
+    translator = get_translator()
+    cached = await translation_cache.get(text, lang_name, translator.name)
+    if cached is not None:
+        await bot.send_message(chat_id, cached)
+        return cached
+
+    permit = breaker.admit()
+    if permit is None:
+        final_text = _untranslated(text)
+        await bot.send_message(chat_id, final_text)
+        return final_text
+
+    parts = []
+    sent = None
+    shown = ""
+    last_edit = 0.0
+    translated = None
+    partials_failed = False
+    stream = translator.translate_stream(text, lang_name)
+    try:
+        while True:
+            # Ошибки провайдера отделены от ошибок Telegram: только первые
+            # считаются неудачей перевода
             try:
-                response = await client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_msg},
-                        {"role": "user", "content": text}
-                    ],
-                    temperature=0.2
-                )
-                return response.choices[0].message.content.strip()
-            except (RateLimitError, Timeout, APIError, OpenAIError) as e:
-                if attempt == retries:
-                    print(f"❌ Перевод не удался после {retries} попыток: {e}")
-                    return text
-                await asyncio.sleep(delay * attempt)
\ No newline at end of file
+                chunk = await anext(stream)
+            except StopAsyncIteration:
+                translated = "".join(parts).strip() or None
+                break
+            except Exception as e:
+                logger.error(f"❌ Стриминг перевода ({lang_name}) прерван: {e}")
+                break
+
+            parts.append(chunk)
+            current = "".join(parts).strip()
+            if not current:
+                continue
+
+            now = time.monotonic()
+            if partials_failed or (sent is not None and now - last_edit < TRANSLATION_STREAM_EDIT_INTERVAL):
+                continue
+            if sent is None:
+                try:
+                    sent = await bot.send_message(chat_id, current, parse_mode=None)
+                except TelegramAPIError as e:
+                    # Не смогли показать начало — дочитываем перевод и шлём целиком
+                    logger.warning(f"⚠ Не удалось показать перевод в чате {chat_id}: {e}")
+                    partials_failed = True
+                    continue
+            else:
+                await _edit_stream_message(bot, chat_id, sent.message_id, current)
+            shown = current
+            last_edit = now
+
+        if translated is None:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    finally:
+        # Отмена или ошибка Telegram до record_* не должны запереть half_open
+        breaker.release(permit)
+        await stream.aclose()
+
+    # Перевод не удался — показываем оригинал, как и translate_with_gpt
+    final_text = translated or text
+
+    if sent is None:
+        await bot.send_message(chat_id, final_text)
+    elif shown != final_text or translated is not None:
+        # Промежуточный текст показан без разметки — итог применяет её
+        await _edit_stream_message(bot, chat_id, sent.message_id, final_text, final=True)
+
+    if translated is not None:
+        await translation_cache.put(text, lang_name, translator.name, translated)
+    return final_text
@@ -0,0 +1,142 @@
+# services/resilience.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from utils.logger import logger
+
+
+class AdaptiveLimiter:
+    """
+    Лимит параллельных запросов по AIMD: при быстрых успешных ответах
+    лимит растёт на 1/limit, при 429 — падает вдвое, при медленных — на 10%.
+    """
+    def __init__(self, initial: int, min_limit: int, max_limit: int, target_latency: float):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.waiting = 0
+        self.overloads = 0
+        self.last_latency = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        self.last_latency = latency
+        if latency > self.target_latency:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self):
+        self.overloads += 1
+        self.limit = max(self.min_limit, self.limit / 2)
+        logger.warning(f"⚠ Переводчик перегружен, лимит снижен до {int(self.limit)}")
+
+    def metrics(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "overloads": self.overloads,
+            "last_latency": round(self.last_latency, 3),
+        }
+
+
+class CircuitBreaker:
+    """
+    closed → open после failure_threshold неудач подряд;
+    open → half_open через reset_timeout секунд (пропускается один пробный вызов);
+    half_open → closed при успехе, → open при неудаче.
+
+    admit() выдаёт пропуск, release(permit) его возвращает: пробный вызов
+    получает свой номер, и чужой release его не освободит.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        # Номер пробного вызова в полёте (0 — нет) и счётчик номеров
+        self._probe = 0
+        self._probes = 0
+
+    def admit(self) -> int | None:
+        """
+        None — вызов отклонён. Иначе пропуск для release(): номер пробного
+        вызова в half_open или 0 для обычного.
+        """
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe = 0
+
+        if self.state == self.CLOSED:
+            return 0
+        if self.state == self.HALF_OPEN and not self._probe:
+            self._probes += 1
+            self._probe = self._probes
+            return self._probe
+
+        self.rejected += 1
+        return None
+
+    def release(self, permit: int):
+        """
+        Возвращает пробный вызов, если он завершился без record_* (отмена,
+        ошибка, не относящаяся к провайдеру). Иначе half_open закрыт навсегда.
+        Вызов, пропущенный ещё в closed, чужую пробу не освобождает.
+        """
+        if permit and permit == self._probe:
+            self._probe = 0
+
+    def record_success(self):
+        self.total_successes += 1
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"✅ {self.name}: предохранитель закрыт")
+        self.state = self.CLOSED
+        self._probe = 0
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(f"❌ {self.name}: предохранитель открыт после {self.failures} неудач")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe = 0
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "total_failures": self.total_failures,
+            "total_successes": self.total_successes,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,93 @@
+# services/routing.py
+import asyncio
+from dataclasses import dataclass, field
+from database import crud, events
+from services.shared_cache import shared_cache
+from utils.logger import logger
+from config import ROUTING_POLL_INTERVAL
+
+
+@dataclass(frozen=True)
+class RoutingTable:
+    """
+    Готовая таблица маршрутизации запросов по группам поддержки.
+    """
+    # язык пользователя -> группы с этим языком (в порядке из БД)
+    groups_by_language: dict[str, tuple[int, ...]] = field(default_factory=dict)
+    # id группы -> название
+    group_titles: dict[int, str] = field(default_factory=dict)
+    # язык пользователя -> первая из его групп, где есть и ru
+    ru_group_by_language: dict[str, int] = field(default_factory=dict)
+
+
+def build_routing(groups: list[dict]) -> RoutingTable:
+    groups_by_language: dict[str, list[int]] = {}
+    group_titles = {}
+    for group in groups:
+        group_titles[group["group_id"]] = group["group_name"]
+        for lang in group["languages"]:
+            groups_by_language.setdefault(lang, []).append(group["group_id"])
+
+    languages_by_group = {group["group_id"]: group["languages"] for group in groups}
+    ru_group_by_language = {}
+    for lang, group_ids in groups_by_language.items():
+        ru_group = next((gid for gid in group_ids if "ru" in languages_by_group[gid]), None)
+        if ru_group is not None:
+            ru_group_by_language[lang] = ru_group
+
+    return RoutingTable(
+        groups_by_language={lang: tuple(ids) for lang, ids in groups_by_language.items()},
+        group_titles=group_titles,
+        ru_group_by_language=ru_group_by_language
+    )
+
+
+_routing = RoutingTable()
+_fingerprint: tuple | None = None
+
+
+def get_routing() -> RoutingTable:
+    return _routing
+
+
+async def load_routing():
+    global _routing, _fingerprint
+    _fingerprint = await crud.get_routing_fingerprint()
+    groups = await crud.get_all_groups_with_languages()
+    # Новая таблица собирается целиком и подменяется одной операцией
+    _routing = build_routing(groups)
+    logger.info(f"🧭 Routing table built: {len(_routing.group_titles)} groups, {len(_routing.groups_by_language)} languages")
+
+
+@events.on("groups_changed")
+async def _on_groups_changed(group_id: int | None):
+    await load_routing()
+    await shared_cache.broadcast("routing_reload")
+
+
+@shared_cache.on("routing_reload")
+async def _on_routing_reload():
+    # Группы изменили в другом процессе
+    await load_routing()
+
+
+async def watch_routing():
+    """
+    Фоновая проверка групп, изменённых в админке: раз в
+    ROUTING_POLL_INTERVAL секунд сравнивает отпечаток и пересобирает таблицу.
+    """
+    if ROUTING_POLL_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(ROUTING_POLL_INTERVAL)
+        try:
+            if await crud.get_routing_fingerprint() != _fingerprint:
+                old_groups = set(_routing.group_titles)
+                await load_routing()
+                # Админка события groups_changed не шлёт: кеши групп
+                # (GroupFilterMiddleware и др.) сбрасываем сами
+                keys = ["allowed_group_ids", "groups_with_languages"]
+                keys += [f"support_group:{gid}" for gid in old_groups | set(_routing.group_titles)]
+                await shared_cache.invalidate(*keys)
+        except Exception as e:
+            logger.error(f"Ошибка проверки групп поддержки: {e}")
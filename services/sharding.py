@@ -0,0 +1,273 @@
+# services/sharding.py
+import asyncio
+import json
+import queue
+import multiprocessing as mp
+from typing import Callable
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import ClientSession, ClientTimeout
+from services.webhook import serve_webhook, stop_event
+from utils.logger import logger
+from config import (
+    BOT_MODE,
+    CACHE_BACKEND,
+    SHARD_QUEUE_SIZE,
+    SHARD_CONCURRENCY,
+    SHARD_SHUTDOWN_TIMEOUT
+)
+
+# Многопроцессный режим: ingress получает апдейты (polling или вебхук) и,
+# не разбирая их в модели aiogram, раскладывает сырой JSON по воркерам
+# по хешу пользователя/чата. Воркер — обычный бот с теми же роутерами;
+# апдейты одного ключа он обрабатывает строго по очереди.
+
+POLL_TIMEOUT = 30
+
+
+def shard_key(update: dict) -> int:
+    """
+    Ключ шардирования: отправитель события, иначе чат, иначе update_id.
+    """
+    for field, event in update.items():
+        if field == "update_id" or not isinstance(event, dict):
+            continue
+        sender = event.get("from") or event.get("user")
+        if sender and "id" in sender:
+            return sender["id"]
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+    return update.get("update_id", 0)
+
+
+class ShardRouter:
+    """
+    Запускает воркеры target(index, queue) и раскладывает апдейты по их
+    очередям: key % N, так что все апдейты одного пользователя попадают
+    к одному воркеру в порядке прихода.
+
+    Упавший воркер перезапускается с новой очередью (старая могла
+    остаться с захваченной упавшим процессом блокировкой); апдейты,
+    стоявшие в ней, теряются — это пишется в лог.
+    """
+
+    def __init__(self, workers: int, target: Callable[[int, mp.Queue], None], queue_size: int = SHARD_QUEUE_SIZE):
+        self._ctx = mp.get_context("spawn")
+        self._target = target
+        self._queue_size = queue_size
+        self.queues: list[mp.Queue] = [None] * workers
+        self.processes: list[mp.Process] = [None] * workers
+        self.closing = False
+        self.routed = [0] * workers
+        self.restarts = 0
+        for index in range(workers):
+            self._spawn(index)
+
+    def _spawn(self, index: int):
+        shard = self._ctx.Queue(self._queue_size)
+        process = self._ctx.Process(target=self._target, args=(index, shard), name=f"shard-{index}")
+        process.start()
+        self.queues[index] = shard
+        self.processes[index] = process
+
+    def check_workers(self):
+        """
+        Перезапускает воркеры, процесс которых завершился.
+        """
+        if self.closing:
+            return
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            logger.error(
+                f"❌ {process.name} завершился (exitcode {process.exitcode}), перезапускаю; "
+                f"апдейты из его очереди потеряны"
+            )
+            self.restarts += 1
+            self._spawn(index)
+
+    async def watch(self, interval: float = 1.0):
+        while not self.closing:
+            self.check_workers()
+            await asyncio.sleep(interval)
+
+    async def route(self, update: dict, body: bytes | None = None):
+        index = shard_key(update) % len(self.queues)
+        payload = body if body is not None else json.dumps(update).encode()
+        while True:
+            try:
+                self.queues[index].put_nowait(payload)
+                break
+            except queue.Full:
+                # Воркер не успевает (или упал) — придерживаем ingress и Telegram вместе с ним
+                self.check_workers()
+                await asyncio.sleep(0.005)
+        self.routed[index] += 1
+
+    async def submit(self, body: bytes):
+        await self.route(json.loads(body), body)
+
+    async def stop(self, timeout: float = SHARD_SHUTDOWN_TIMEOUT):
+        """
+        Отправляет воркерам None и ждёт, пока они доработают очереди.
+        """
+        self.closing = True
+        loop = asyncio.get_running_loop()
+        for shard, process in zip(self.queues, self.processes):
+            try:
+                # Не блокируем цикл событий на полной очереди мёртвого воркера
+                await loop.run_in_executor(None, shard.put, None, True, 1.0)
+            except queue.Full:
+                logger.warning(f"⚠ {process.name}: очередь полна, сигнал остановки не доставлен")
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"⚠ {process.name} не завершился, останавливаю")
+                process.terminate()
+
+    def stats(self) -> dict:
+        return {
+            "routed": self.routed,
+            "alive": [process.is_alive() for process in self.processes],
+            "restarts": self.restarts,
+            "closing": self.closing,
+        }
+
+
+async def _poll_raw(bot: Bot, router: ShardRouter, allowed_updates: list[str]):
+    """
+    getUpdates без разбора в модели aiogram: ingress только читает id
+    отправителя из JSON и пересылает апдейт воркеру как есть.
+    """
+    await bot.delete_webhook()
+    url = bot.session.api.api_url(bot.token, "getUpdates")
+    offset = 0
+    async with ClientSession(timeout=ClientTimeout(total=POLL_TIMEOUT + 10)) as http:
+        try:
+            while True:
+                params = {"offset": offset, "timeout": POLL_TIMEOUT, "allowed_updates": allowed_updates}
+                try:
+                    async with http.post(url, json=params) as response:
+                        data = await response.json()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Ошибка getUpdates: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                if not data.get("ok"):
+                    logger.error(f"getUpdates: {data.get('description')}")
+                    await asyncio.sleep(data.get("parameters", {}).get("retry_after", 1))
+                    continue
+                for update in data["result"]:
+                    await router.route(update)
+                    offset = update["update_id"] + 1
+        finally:
+            # Подтверждаем уже разосланные апдейты, иначе после перезапуска придут снова
+            if offset:
+                async with http.post(url, json={"offset": offset, "timeout": 0, "limit": 1}):
+                    pass
+
+
+async def run_ingress(
+    bot: Bot,
+    allowed_updates: list[str],
+    workers: int,
+    target: Callable[[int, mp.Queue], None]
+):
+    """
+    Процесс-ingress: запускает workers процессов target(index, queue) и
+    раздаёт им апдейты из getUpdates или вебхука (BOT_MODE).
+
+    Остановка: ingress перестаёт принимать апдейты, каждому воркеру уходит
+    None, воркеры дорабатывают очередь и выходят.
+    """
+    if CACHE_BACKEND != "redis":
+        # Кеш сущностей, таблица маршрутизации и их инвалидация живут в
+        # процессе: без redis воркер пользователя не узнает, что запрос
+        # взял или закрыл модератор из другого воркера
+        raise RuntimeError("SHARD_WORKERS > 0 требует CACHE_BACKEND=redis")
+
+    router = ShardRouter(workers, target)
+    logger.info(f"🔀 Ingress: {workers} workers, mode={BOT_MODE}")
+    watcher = asyncio.create_task(router.watch())
+    stop = stop_event()
+    try:
+        if BOT_MODE == "webhook":
+            await serve_webhook(bot, router, allowed_updates, stop)
+        else:
+            poller = asyncio.create_task(_poll_raw(bot, router, allowed_updates))
+            await stop.wait()
+            # Долгий getUpdates не ждём: всё, что он вернул бы, Telegram отдаст снова
+            poller.cancel()
+            await asyncio.gather(poller, return_exceptions=True)
+    finally:
+        watcher.cancel()
+        await router.stop()
+        await bot.session.close()
+
+
+async def consume_shard(
+    dp: Dispatcher,
+    bot: Bot,
+    shard: mp.Queue,
+    concurrency: int = SHARD_CONCURRENCY,
+    backlog: int = SHARD_QUEUE_SIZE
+) -> int:
+    """
+    Цикл воркера: читает апдейты из очереди до None и передаёт их в
+    dp.feed_update. Разные ключи обрабатываются параллельно (не больше
+    concurrency одновременно), апдейты одного ключа — строго по порядку.
+    Прочитано, но не обработано — не больше backlog апдейтов.
+    Возвращает число обработанных апдейтов.
+    """
+    loop = asyncio.get_running_loop()
+    # Слот берёт только апдейт, дошедший до головы цепочки своего ключа:
+    # очередь из апдейтов одного пользователя не занимает слоты остальных
+    slots = asyncio.Semaphore(concurrency)
+    unfinished = asyncio.Semaphore(backlog)
+    tails: dict[int, asyncio.Future] = {}
+    tasks: set[asyncio.Task] = set()
+    handled = 0
+
+    async def process(key: int, update: Update, previous: asyncio.Future | None, done: asyncio.Future):
+        nonlocal handled
+        try:
+            if previous:
+                await previous
+            async with slots:
+                await dp.feed_update(bot, update)
+            handled += 1
+        except Exception as e:
+            logger.error(f"Ошибка обработки апдейта {update.update_id}: {e}")
+        finally:
+            done.set_result(None)
+            if tails.get(key) is done:
+                del tails[key]
+            unfinished.release()
+
+    while True:
+        await unfinished.acquire()
+        payload = await loop.run_in_executor(None, shard.get)
+        if payload is None:
+            unfinished.release()
+            break
+        try:
+            data = json.loads(payload)
+            update = Update.model_validate(data, context={"bot": bot})
+        except ValueError as e:
+            logger.error(f"Битый апдейт в очереди шарда: {e}")
+            unfinished.release()
+            continue
+
+        key = shard_key(data)
+        done = loop.create_future()
+        previous = tails.get(key)
+        tails[key] = done
+        task = asyncio.create_task(process(key, update, previous, done))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return handled
@@ -0,0 +1,323 @@
+# services/shared_cache.py
+import asyncio
+import functools
+import json
+import pickle
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable
+from utils.logger import logger
+from config import (
+    CACHE_BACKEND,
+    CACHE_REDIS_URL,
+    CACHE_CHANNEL,
+    CACHE_L1_TTL,
+    CACHE_L1_MAX_ITEMS,
+    CACHE_REFRESH_AHEAD,
+    CACHE_NEGATIVE_TTL
+)
+
+
+class MemoryBackend:
+    """
+    Кеш в памяти процесса (LRU на max_items записей). Рассылки некому
+    доставлять — publish ничего не делает.
+    """
+    # Как часто вычищать истёкшие записи, которые больше никто не читает
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._swept_at = time.monotonic()
+
+    async def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        now = time.monotonic()
+        self._data[key] = (now + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+        if now - self._swept_at >= self.SWEEP_INTERVAL:
+            self._swept_at = now
+            for expired in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+                del self._data[expired]
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def publish(self, message: dict):
+        pass
+
+    async def listen(self, handler: Callable[[dict], Awaitable[None]]):
+        pass
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Сетевой KV (Redis или совместимый локальный сервер) + pub/sub для рассылок.
+    """
+    def __init__(self, url: str, channel: str):
+        from redis import asyncio as aioredis
+
+        self.redis = aioredis.from_url(url)
+        self.channel = channel
+
+    async def get(self, key: str) -> Any:
+        raw = await self.redis.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.redis.set(key, pickle.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.redis.delete(*keys)
+
+    async def publish(self, message: dict):
+        await self.redis.publish(self.channel, json.dumps(message))
+
+    async def listen(self, handler: Callable[[dict], Awaitable[None]]):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await handler(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка подписки на {self.channel}: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class _Missing:
+    """
+    Закешированное «строки нет» — в отличие от None («в кеше ничего»).
+    Распикливается в тот же объект, поэтому переживает и redis.
+    """
+    def __reduce__(self):
+        return "MISSING"
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class SharedCache:
+    """
+    Двухуровневый кеш: L1 в памяти процесса перед общим бэкендом.
+    Инвалидация удаляет ключ в бэкенде и рассылается остальным процессам,
+    чтобы те сбросили свой L1.
+
+    get_or_load объединяет одновременные промахи по одному ключу в одну
+    загрузку (single-flight) и обновляет записи в фоне до истечения TTL.
+    Загрузка, во время которой ключ инвалидировали, результат не записывает.
+    Эта защита действует в пределах процесса: инвалидация из другого
+    процесса приходит по pub/sub с задержкой, и загрузка, закончившаяся
+    до её прихода, может записать в общий бэкенд устаревшее значение
+    (его ограничивает TTL записи).
+    """
+    def __init__(self, backend, l1_ttl: float, l1_max_items: int):
+        self.backend = backend
+        self.l1_ttl = l1_ttl
+        self.l1_max_items = l1_max_items
+        self.instance_id = uuid.uuid4().hex
+        self._l1: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._handlers: dict[str, list[Callable[..., Awaitable[None]]]] = defaultdict(list)
+        self._listener: asyncio.Task | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Загрузки, чей ключ инвалидировали, пока они шли; живут до их завершения
+        self._stale: set[asyncio.Task] = set()
+
+    # ---- L1 ----
+
+    def _l1_get(self, key: str) -> Any:
+        item = self._l1.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._l1.pop(key, None)
+            return None
+        self._l1.move_to_end(key)
+        return value
+
+    def _l1_set(self, key: str, value: Any, ttl: float):
+        if self.l1_ttl <= 0:
+            return
+        self._l1[key] = (time.monotonic() + min(ttl, self.l1_ttl), value)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_max_items:
+            self._l1.popitem(last=False)
+
+    def _l1_drop(self, keys):
+        for key in keys:
+            self._l1.pop(key, None)
+            task = self._inflight.pop(key, None)
+            if task is not None:
+                self._stale.add(task)
+
+    # ---- API ----
+
+    async def get(self, key: str) -> Any:
+        value = self._l1_get(key)
+        if value is not None:
+            return value
+        value = await self.backend.get(key)
+        if value is not None:
+            self._l1_set(key, value, self.l1_ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.backend.set(key, value, ttl)
+        self._l1_set(key, value, ttl)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float, negative_ttl: float) -> Any:
+        value = await loader()
+        if asyncio.current_task() in self._stale:
+            return value
+        # В кеше лежит (момент, когда пора обновлять, значение)
+        if value is not None:
+            await self.set(key, (time.time() + ttl * CACHE_REFRESH_AHEAD, value), ttl)
+        elif negative_ttl > 0:
+            await self.set(key, (time.time() + negative_ttl, MISSING), negative_ttl)
+        return value
+
+    def _start_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        negative_ttl: float
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader, ttl, negative_ttl))
+            self._inflight[key] = task
+
+            def done(finished: asyncio.Task):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+                self._stale.discard(finished)
+                if not finished.cancelled() and finished.exception():
+                    logger.error(f"Ошибка загрузки {key}: {finished.exception()}")
+
+            task.add_done_callback(done)
+        return task
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        negative_ttl: float = 0
+    ) -> Any:
+        """
+        Значение из кеша или из loader. None от loader («строки нет»)
+        кешируется на negative_ttl секунд; исключение не кешируется —
+        вызывающий получает None, ошибка пишется в лог.
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            refresh_at, value = entry
+            if time.time() >= refresh_at:
+                # Отдаём текущее значение, обновляем в фоне
+                self._start_load(key, loader, ttl, negative_ttl)
+            return None if value is MISSING else value
+
+        # shield: отмена одного ожидающего не отменяет загрузку для остальных
+        try:
+            return await asyncio.shield(self._start_load(key, loader, ttl, negative_ttl))
+        except Exception:
+            return None
+
+    async def invalidate(self, *keys: str):
+        self._l1_drop(keys)
+        await self.backend.delete(*keys)
+        await self.broadcast("invalidate", keys=list(keys))
+
+    def on(self, kind: str):
+        """
+        Подписка на рассылку от других процессов: @shared_cache.on("translations_reload")
+        """
+        def decorator(handler: Callable[..., Awaitable[None]]):
+            self._handlers[kind].append(handler)
+            return handler
+        return decorator
+
+    async def broadcast(self, kind: str, **payload):
+        await self.backend.publish({"kind": kind, "origin": self.instance_id, **payload})
+
+    async def _on_message(self, message: dict):
+        if message.pop("origin", None) == self.instance_id:
+            return
+        kind = message.pop("kind", None)
+        if kind == "invalidate":
+            self._l1_drop(message.get("keys", []))
+        for handler in self._handlers.get(kind, []):
+            try:
+                await handler(**message)
+            except Exception as e:
+                logger.error(f"Error in {kind} handler {handler.__name__}: {e}")
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.backend.listen(self._on_message))
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+        await self.backend.close()
+
+
+def _create_shared_cache() -> SharedCache:
+    if CACHE_BACKEND == "redis":
+        return SharedCache(RedisBackend(CACHE_REDIS_URL, CACHE_CHANNEL), CACHE_L1_TTL, CACHE_L1_MAX_ITEMS)
+    if CACHE_BACKEND == "memory":
+        # Бэкенд и так в памяти процесса — L1 перед ним не нужен
+        return SharedCache(MemoryBackend(CACHE_L1_MAX_ITEMS), 0, CACHE_L1_MAX_ITEMS)
+    raise ValueError(f"Неизвестный CACHE_BACKEND: {CACHE_BACKEND}")
+
+
+shared_cache = _create_shared_cache()
+
+
+def make_key(prefix: str, *args, **kwargs) -> str:
+    return ":".join([prefix, *map(str, args), *map(str, kwargs.values())])
+
+
+def shared_cached(prefix: str, ttl: float, negative_ttl: float = CACHE_NEGATIVE_TTL):
+    """
+    Кеширует результат загрузчика в shared_cache под ключом "prefix:arg1:...".
+    None кешируется на negative_ttl секунд; если загрузчик бросил
+    исключение, ничего не кешируется и возвращается None.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(prefix, *args, **kwargs)
+            return await shared_cache.get_or_load(key, lambda: func(*args, **kwargs), ttl, negative_ttl)
+        return wrapper
+    return decorator
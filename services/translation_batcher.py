@@ -0,0 +1,75 @@
+# services/translation_batcher.py
+import asyncio
+from typing import Awaitable, Callable
+from utils.logger import logger
+
+# process(lang_name, texts) -> список переводов той же длины (None — не удалось)
+BatchProcessor = Callable[[str, list[str]], Awaitable[list[str | None]]]
+
+
+def estimate_tokens(text: str) -> int:
+    # Грубая оценка: ~4 символа на токен
+    return len(text) // 4 + 1
+
+
+class TranslationBatcher:
+    """
+    Собирает переводы, пришедшие в течение короткого окна, в один пакет
+    на каждый целевой язык и раздаёт результаты ожидающим вызовам.
+    """
+    def __init__(self, process: BatchProcessor, window: float, max_items: int, max_tokens: int):
+        self._process = process
+        self.window = window
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._tokens: dict[str, int] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, text: str, lang_name: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        cost = estimate_tokens(text)
+
+        # Не влезает в бюджет токенов — отправляем накопленное и начинаем новый пакет
+        if lang_name in self._pending and self._tokens[lang_name] + cost > self.max_tokens:
+            self._flush(lang_name)
+
+        batch = self._pending.setdefault(lang_name, [])
+        batch.append((text, future))
+        self._tokens[lang_name] = self._tokens.get(lang_name, 0) + cost
+
+        if len(batch) >= self.max_items:
+            self._flush(lang_name)
+        elif len(batch) == 1:
+            self._timers[lang_name] = loop.call_later(self.window, self._flush, lang_name)
+
+        return await future
+
+    def _flush(self, lang_name: str):
+        timer = self._timers.pop(lang_name, None)
+        if timer:
+            timer.cancel()
+        self._tokens.pop(lang_name, None)
+        batch = self._pending.pop(lang_name, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(lang_name, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, lang_name: str, batch: list[tuple[str, asyncio.Future]]):
+        # Одинаковые тексты в пакете переводим один раз
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            results = await self._process(lang_name, texts)
+        except Exception as e:
+            logger.exception(f"❌ Ошибка пакетного перевода ({lang_name}): {e}")
+            results = [None] * len(texts)
+
+        by_text = dict(zip(texts, results))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text.get(text))
@@ -0,0 +1,94 @@
+# services/translation_cache.py
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from database import crud
+from config import TRANSLATION_CACHE_BYTES
+
+# Счётчики попаданий/промахов
+stats = {
+    "memory_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+}
+
+
+def normalize(text: str) -> str:
+    # NFC + схлопывание пробелов внутри строк: "hello " и "hello" — один ключ.
+    # Переводы строк сохраняются: от них зависит разметка перевода
+    lines = (" ".join(line.split()) for line in unicodedata.normalize("NFC", text).splitlines())
+    return "\n".join(lines).strip("\n")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    LRU в памяти процесса с ограничением по суммарному размеру значений.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+
+    @staticmethod
+    def _cost(key: tuple, value: str) -> int:
+        return len(value.encode("utf-8")) + sum(len(part) for part in key)
+
+    def get(self, key: tuple) -> str | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: str):
+        if key in self._data:
+            self.size -= self._cost(key, self._data.pop(key))
+        cost = self._cost(key, value)
+        if cost > self.max_bytes:
+            return
+        self._data[key] = value
+        self.size += cost
+        while self.size > self.max_bytes:
+            old_key, old_value = self._data.popitem(last=False)
+            self.size -= self._cost(old_key, old_value)
+
+    def __len__(self):
+        return len(self._data)
+
+
+_memory = LRUCache(TRANSLATION_CACHE_BYTES)
+
+
+async def get(text: str, target_lang: str, model: str) -> str | None:
+    key = (text_hash(text), target_lang, model)
+
+    value = _memory.get(key)
+    if value is not None:
+        stats["memory_hits"] += 1
+        return value
+
+    value = await crud.get_cached_translation(*key)
+    if value is not None:
+        stats["db_hits"] += 1
+        _memory.set(key, value)
+        return value
+
+    stats["misses"] += 1
+    return None
+
+
+async def put(text: str, target_lang: str, model: str, translated: str):
+    key = (text_hash(text), target_lang, model)
+    _memory.set(key, translated)
+    await crud.save_cached_translation(*key, translated)
+
+
+def get_stats() -> dict:
+    return {
+        **stats,
+        "memory_entries": len(_memory),
+        "memory_bytes": _memory.size,
+    }
@@ -0,0 +1,225 @@
+# services/translators.py
+import os
+import json
+import time
+import asyncio
+import aiohttp
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+from services.resilience import AdaptiveLimiter
+from utils.logger import logger
+
+
+def _system_msg(lang_name: str) -> str:
+    return (
+        f"Ты — профессиональный переводчик и носитель языка ({lang_name}).\n"
+        f"Твоя задача — перевести сообщение для службы поддержки на {lang_name}.\n\n"
+        f"Переводи так, как сказал бы реальный человек. Разрешён лёгкий неформальный стиль, если он уместен.\n\n"
+        f"Важно:\n"
+        f"- Не добавляй ничего лишнего. Ответ — только перевод оригинального текста."
+    )
+
+
+def _batch_system_msg(lang_name: str) -> str:
+    return (
+        _system_msg(lang_name) + "\n\n"
+        f"На вход приходит JSON-массив независимых сообщений.\n"
+        f"Переведи каждое отдельно и верни JSON-объект вида "
+        f"{{\"translations\": [...]}} — строго того же размера и в том же порядке."
+    )
+
+
+class Translator(ABC):
+    """
+    Базовый интерфейс переводчика. None в результате — перевод не удался.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def translate(self, text: str, lang_name: str) -> str | None:
+        ...
+
+    async def translate_batch(self, texts: list[str], lang_name: str) -> list[str | None]:
+        return list(await asyncio.gather(*(self.translate(text, lang_name) for text in texts)))
+
+    async def translate_stream(self, text: str, lang_name: str) -> AsyncIterator[str]:
+        """
+        Отдаёт перевод кусками по мере готовности. Ошибку — бросает исключением.
+        По умолчанию весь перевод приходит одним куском.
+        """
+        translated = await self.translate(text, lang_name)
+        if translated is None:
+            raise RuntimeError(f"{self.name}: перевод не удался")
+        yield translated
+
+    async def close(self):
+        pass
+
+
+class OpenAITranslator(Translator):
+    def __init__(self, api_key: str, model: str, limiter: AdaptiveLimiter, retries: int = 3, delay: float = 2.0):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.name = model
+        self.retries = retries
+        self.delay = delay
+        # Адаптивный лимит одновременных переводов
+        self.limiter = limiter
+
+    async def _complete(self, messages: list[dict], **kwargs) -> str | None:
+        from openai import OpenAIError, RateLimitError
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self.limiter.slot():  # 👈 здесь лимит concurrency
+                    start = time.monotonic()
+                    response = await self.client.chat.completions.create(
+                        model=self.name,
+                        messages=messages,
+                        temperature=0.2,
+                        **kwargs
+                    )
+                    self.limiter.on_success(time.monotonic() - start)
+                return response.choices[0].message.content.strip()
+            except OpenAIError as e:
+                if isinstance(e, RateLimitError):
+                    self.limiter.on_overload()
+                if attempt == self.retries:
+                    logger.error(f"❌ Перевод не удался после {self.retries} попыток: {e}")
+                    return None
+            # Пауза перед повтором — уже без занятого слота
+            await asyncio.sleep(self.delay * attempt)
+
+    async def translate(self, text: str, lang_name: str) -> str | None:
+        return await self._complete([
+            {"role": "system", "content": _system_msg(lang_name)},
+            {"role": "user", "content": text}
+        ])
+
+    async def translate_stream(self, text: str, lang_name: str) -> AsyncIterator[str]:
+        async with self.limiter.slot():
+            stream = await self.client.chat.completions.create(
+                model=self.name,
+                messages=[
+                    {"role": "system", "content": _system_msg(lang_name)},
+                    {"role": "user", "content": text}
+                ],
+                temperature=0.2,
+                stream=True
+            )
+            async for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+
+    async def translate_batch(self, texts: list[str], lang_name: str) -> list[str | None]:
+        if len(texts) == 1:
+            return [await self.translate(texts[0], lang_name)]
+
+        content = await self._complete(
+            [
+                {"role": "system", "content": _batch_system_msg(lang_name)},
+                {"role": "user", "content": json.dumps(texts, ensure_ascii=False)}
+            ],
+            response_format={"type": "json_object"}
+        )
+        if content is None:
+            # Провайдер не ответил после всех повторов — по одному тоже не ответит
+            return [None] * len(texts)
+
+        try:
+            translations = json.loads(content)["translations"]
+            if len(translations) == len(texts) and all(isinstance(item, str) for item in translations):
+                return [item.strip() for item in translations]
+        except (TypeError, ValueError, KeyError):
+            pass
+
+        # Пакет не разобрался — переводим по одному
+        logger.warning(f"⚠ Пакетный перевод ({lang_name}, {len(texts)} шт.) не разобран, перевожу по одному")
+        return await super().translate_batch(texts, lang_name)
+
+
+class HTTPTranslator(Translator):
+    """
+    Переводчик поверх локального HTTP-сервиса.
+    Протокол: POST {url}/translate {"lang": ..., "texts": [...]} -> {"translations": [...]}.
+    """
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url.rstrip("/")
+        self.name = f"http:{self.url}"
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def translate(self, text: str, lang_name: str) -> str | None:
+        return (await self.translate_batch([text], lang_name))[0]
+
+    async def translate_batch(self, texts: list[str], lang_name: str) -> list[str | None]:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        try:
+            async with self._session.post(
+                f"{self.url}/translate",
+                json={"lang": lang_name, "texts": texts}
+            ) as resp:
+                resp.raise_for_status()
+                translations = (await resp.json())["translations"]
+            if len(translations) == len(texts):
+                return translations
+            logger.warning(f"⚠ {self.name}: вернул {len(translations)} переводов вместо {len(texts)}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            logger.error(f"❌ {self.name}: перевод не удался: {e}")
+        return [None] * len(texts)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class DictionaryTranslator(Translator):
+    """
+    Детерминированный офлайн-переводчик: словарь {lang_name: {text: перевод}},
+    всё, чего нет в словаре, возвращается как есть.
+    """
+    name = "dictionary"
+
+    def __init__(self, entries: dict[str, dict[str, str]] | None = None):
+        self.entries = entries or {}
+
+    @classmethod
+    def from_file(cls, path: str | None) -> "DictionaryTranslator":
+        if not path:
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    async def translate(self, text: str, lang_name: str) -> str | None:
+        return self.entries.get(lang_name, {}).get(text, text)
+
+
+def create_translator(backend: str) -> Translator:
+    from config import (
+        OPENAI_MODEL,
+        TRANSLATOR_HTTP_URL,
+        TRANSLATOR_DICT_PATH,
+        TRANSLATION_CONCURRENCY_INITIAL,
+        TRANSLATION_CONCURRENCY_MIN,
+        TRANSLATION_CONCURRENCY_MAX,
+        TRANSLATION_TARGET_LATENCY
+    )
+
+    if backend == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("❌ Переменная OPENAI_API_KEY не найдена в окружении")
+        limiter = AdaptiveLimiter(
+            TRANSLATION_CONCURRENCY_INITIAL,
+            TRANSLATION_CONCURRENCY_MIN,
+            TRANSLATION_CONCURRENCY_MAX,
+            TRANSLATION_TARGET_LATENCY
+        )
+        return OpenAITranslator(api_key, OPENAI_MODEL, limiter)
+    if backend == "http":
+        return HTTPTranslator(TRANSLATOR_HTTP_URL)
+    if backend == "dictionary":
+        return DictionaryTranslator.from_file(TRANSLATOR_DICT_PATH)
+    raise ValueError(f"Неизвестный TRANSLATOR_BACKEND: {backend}")
@@ -0,0 +1,180 @@
+# services/webhook.py
+import asyncio
+import hmac
+import signal
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+from utils.logger import logger
+from config import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_SHUTDOWN_TIMEOUT
+)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdatePool:
+    """
+    Ограниченный пул обработки апдейтов: workers задач разбирают очередь
+    из queue_size апдейтов и передают их в dp.feed_update.
+
+    Когда очередь полна, put ждёт — ответ Telegram задерживается, и он сам
+    снижает темп доставки (не больше max_connections запросов в полёте).
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, workers: int, queue_size: int):
+        self.dp = dp
+        self.bot = bot
+        self.queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=queue_size)
+        self.closing = False
+        self.handled = 0
+        self.failed = 0
+        self._size = workers
+        self._workers: list[asyncio.Task] = []
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._size)]
+
+    async def submit(self, body: bytes):
+        """
+        Разбирает тело запроса Telegram и ставит апдейт в очередь.
+        ValueError — тело не является апдейтом.
+        """
+        update = Update.model_validate_json(body, context={"bot": self.bot})
+        await self.queue.put(update)
+
+    async def _worker(self):
+        while True:
+            update = await self.queue.get()
+            try:
+                await self.dp.feed_update(self.bot, update)
+                self.handled += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Ошибка обработки апдейта {update.update_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def stop(self, timeout: float):
+        """
+        Дорабатывает уже принятые апдейты (не дольше timeout) и гасит воркеров.
+        """
+        self.closing = True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠ Не успели обработать {self.queue.qsize()} апдейтов до остановки")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "handled": self.handled,
+            "failed": self.failed,
+            "closing": self.closing,
+        }
+
+
+def build_webhook_app(pool, path: str = WEBHOOK_PATH, secret: str = WEBHOOK_SECRET) -> web.Application:
+    """
+    aiohttp-приложение вебхука:
+      POST {path} — апдейт от Telegram (проверяется секретный заголовок);
+      GET /healthz — состояние пула для reverse proxy и мониторинга.
+
+    pool — UpdatePool или services.sharding.ShardRouter: submit(body),
+    closing и stats().
+    """
+
+    async def handle_update(request: web.Request) -> web.Response:
+        if secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            return web.Response(status=401)
+        if pool.closing:
+            # Telegram повторит доставку, когда процесс (или соседний) поднимется
+            return web.Response(status=503)
+        try:
+            await pool.submit(await request.read())
+        except ValueError:
+            return web.Response(status=400)
+        return web.Response(text="ok")
+
+    async def healthz(request: web.Request) -> web.Response:
+        return web.json_response(pool.stats())
+
+    app = web.Application()
+    app.router.add_post(path, handle_update)
+    app.router.add_get("/healthz", healthz)
+    return app
+
+
+def stop_event() -> asyncio.Event:
+    """
+    Событие, выставляемое по SIGINT/SIGTERM.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    return stop
+
+
+async def serve_webhook(bot: Bot, pool, allowed_updates: list[str], stop: asyncio.Event):
+    """
+    Поднимает сервер вебхука, регистрирует его в Telegram (если задан
+    WEBHOOK_URL) и работает до stop. При остановке новые апдейты получают
+    503, сервер закрывается после запросов, ждущих места в очереди пула.
+    """
+    runner = web.AppRunner(build_webhook_app(pool))
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+    logger.info(f"🌐 Webhook server: http://{WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    if WEBHOOK_URL:
+        if not WEBHOOK_SECRET:
+            logger.warning("⚠ WEBHOOK_SECRET не задан: вебхук примет запрос от кого угодно")
+        await bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=allowed_updates,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info(f"✅ Webhook set: {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}")
+
+    try:
+        await stop.wait()
+    finally:
+        logger.info("🛑 Stopping webhook server...")
+        pool.closing = True
+        await runner.cleanup()
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """
+    Режим вебхука вместо dp.start_polling: те же Dispatcher и роутеры,
+    апдейты приходят HTTP-запросами на WEBHOOK_HOST:WEBHOOK_PORT.
+
+    Остановка (SIGINT/SIGTERM): принятые апдейты дорабатываются до
+    WEBHOOK_SHUTDOWN_TIMEOUT секунд. Вебхук в Telegram не снимается —
+    на время перезапуска апдейты копятся на его стороне.
+    """
+    pool = UpdatePool(dp, bot, WEBHOOK_CONCURRENCY, WEBHOOK_QUEUE_SIZE)
+    await dp.emit_startup(bot=bot)
+    pool.start()
+    try:
+        await serve_webhook(bot, pool, dp.resolve_used_update_types(), stop_event())
+    finally:
+        await pool.stop(WEBHOOK_SHUTDOWN_TIMEOUT)
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
@@ -1,41 +1,127 @@
 import asyncio
 from aiogram import Bot
+from aiohttp import web
 from services.i18n import t
-from database import crud
+from database import crud, events
+from database.models import Status
 from aiogram.types import ReplyKeyboardRemove
-from services.cache import get_main_keyboard
+from keyboards.registry import main_keyboard
 from utils.logger import logger
-from config import ADMIN_WEB
+from config import (
+    ADMIN_WEB,
+    STATUS_BATCH_SIZE,
+    STATUS_POLL_MIN_INTERVAL,
+    STATUS_POLL_MAX_INTERVAL,
+    STATUS_WAKE_PORT,
+    STATUS_WAKE_SOCKET
+)
+
+# Событие пробуждения: выставляется хуком из админки
+status_wakeup = asyncio.Event()
+
+
+def wake_status_poller():
+    status_wakeup.set()
+
+
+async def _notify(bot: Bot, entry: Status):
+    try:
+        # Основной текст для любой роли
+        if entry.role == "admin":
+            text = await t("assigned_admin", entry.language_code)
+            # Если в статусе есть текст (email + пароль), добавляем его
+            if entry.text:
+                text += f"\n\n{ADMIN_WEB}"
+                text += f"\n\n{entry.text}"
+            reply_markup = ReplyKeyboardRemove()
+
+        elif entry.role == "moderator":
+            text = await t("assigned_mod", entry.language_code)
+            reply_markup = ReplyKeyboardRemove()
+
+        else:  # обычный пользователь
+            text = await t("assigned_user", entry.language_code)
+            reply_markup = main_keyboard(entry.language_code)
+
+        await bot.send_message(entry.id, text, reply_markup=reply_markup)
+        logger.info(f"Уведомление ({entry.role}) отправлено пользователю {entry.id}")
+
+    except Exception as e:
+        logger.error(f"Ошибка при отправке пользователю {entry.id}: {e}")
+
+
+async def _notify_all(bot: Bot, entries: list[Status]):
+    await asyncio.gather(*(_notify(bot, entry) for entry in entries))
+
+
+async def start_wake_server() -> web.AppRunner | None:
+    """
+    Поднимает локальный хук для админки:
+      POST /wake           — будит поллер сразу после изменения ролей;
+      POST /groups_changed — пересобирает маршрутизацию по группам.
+    """
+    if not STATUS_WAKE_PORT and not STATUS_WAKE_SOCKET:
+        return None
+
+    async def wake(request: web.Request) -> web.Response:
+        wake_status_poller()
+        return web.Response(text="ok")
+
+    async def groups_changed(request: web.Request) -> web.Response:
+        await events.publish("groups_changed", group_id=None)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post("/wake", wake)
+    app.router.add_post("/groups_changed", groups_changed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    if STATUS_WAKE_SOCKET:
+        await web.UnixSite(runner, STATUS_WAKE_SOCKET).start()
+        logger.info(f"Status wake hook: unix:{STATUS_WAKE_SOCKET}")
+    else:
+        await web.TCPSite(runner, "127.0.0.1", STATUS_WAKE_PORT).start()
+        logger.info(f"Status wake hook: http://127.0.0.1:{STATUS_WAKE_PORT}/wake")
+    return runner
+
 
 async def poll_status_table(bot: Bot):
+    interval = STATUS_POLL_MIN_INTERVAL
+
     while True:
-        entries = await crud.get_pending_statuses()
-        for entry in entries:
-            try:
-                # Основной текст для любой роли
-                if entry.role == "admin":
-                    text = await t("assigned_admin", entry.language_code)
-                    # Если в статусе есть текст (email + пароль), добавляем его
-                    if entry.text:
-                        text += f"\n\n{ADMIN_WEB}"
-                        text += f"\n\n{entry.text}"
-                    reply_markup = ReplyKeyboardRemove()
-
-                elif entry.role == "moderator":
-                    text = await t("assigned_mod", entry.language_code)
-                    reply_markup = ReplyKeyboardRemove()
-
-                else:  # обычный пользователь
-                    text = await t("assigned_user", entry.language_code)
-                    reply_markup = await get_main_keyboard(entry.language_code)
-
-                await bot.send_message(entry.id, text, reply_markup=reply_markup)
-                logger.info(f"Уведомление ({entry.role}) отправлено пользователю {entry.id}")
-
-            except Exception as e:
-                logger.error(f"Ошибка при отправке пользователю {entry.id}: {e}")
-
-            # Убираем запись, чтобы не дублировать
-            await crud.delete_status_by_id(entry.id)
-
-        await asyncio.sleep(5)
\ No newline at end of file
+        try:
+            processed = await crud.process_pending_statuses(
+                STATUS_BATCH_SIZE,
+                lambda entries: _notify_all(bot, entries)
+            )
+        except Exception as e:
+            logger.error(f"Ошибка опроса таблицы status: {e}")
+            processed = 0
+
+        if processed >= STATUS_BATCH_SIZE:
+            # Пакет полный — сразу берём следующий
+            continue
+
+        # Пусто — увеличиваем паузу, есть записи — возвращаемся к минимальной
+        interval = STATUS_POLL_MIN_INTERVAL if processed else min(interval * 2, STATUS_POLL_MAX_INTERVAL)
+
+        try:
+            await asyncio.wait_for(status_wakeup.wait(), timeout=interval)
+            interval = STATUS_POLL_MIN_INTERVAL
+        except asyncio.TimeoutError:
+            pass
+        status_wakeup.clear()
+
+
+async def run_status_poller(bot: Bot):
+    """
+    Задача лидера: хук пробуждения слушает только процесс, который
+    опрашивает таблицу. Пинг в процесс-последователь ничего бы не дал,
+    а второй процесс на том же хосте упал бы на занятом порту.
+    """
+    runner = await start_wake_server()
+    try:
+        await poll_status_table(bot)
+    finally:
+        if runner:
+            await runner.cleanup()